@@ -0,0 +1,59 @@
+"""Burst test for the write-behind comment queue against the configured MongoDB.
+
+Usage:
+    python bench_comment_queue.py [--comments 5000]
+
+Creates a scratch post, enqueues a burst of comments, drains the queue the way the
+shutdown hook does, then checks that every comment was written, in arrival order, and
+that the post's comment_count matches. The scratch post and its comments are removed.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+
+from server import CommentQueue, db, get_client
+
+async def run(comments: int, batch_size: int, flush_ms: int):
+    post_id = f"post_bench_{uuid.uuid4().hex[:8]}"
+    now = datetime.now(timezone.utc)
+    await db.posts.insert_one({"post_id": post_id, "title": "Comment queue bench", "content": "", "tags": [],
+                               "published": False, "comment_count": 0, "created_at": now, "updated_at": now})
+    queue = CommentQueue(comments, batch_size, flush_ms)
+    try:
+        start = time.perf_counter()
+        for i in range(comments):
+            queue.put({
+                "comment_id": f"comment_{i:012d}",
+                "post_id": post_id,
+                "content": f"Burst comment {i}",
+                "author_name": "Bench",
+                "author_email": None,
+                "created_at": datetime.now(timezone.utc)
+            })
+        enqueued = time.perf_counter() - start
+        await queue.drain()
+        drained = time.perf_counter() - start
+
+        stored = [c["comment_id"] async for c in db.comments.find({"post_id": post_id}, {"_id": 0, "comment_id": 1}).sort("_id", 1)]
+        post = await db.posts.find_one({"post_id": post_id})
+        in_order = stored == sorted(stored)
+
+        print(f"enqueued {comments} in {enqueued * 1000:.1f} ms, drained in {drained * 1000:.1f} ms "
+              f"({comments / drained:.0f} comments/s, {queue.batches} batches)")
+        print(f"stored {len(stored)}/{comments}, in order: {in_order}, comment_count: {post['comment_count']}")
+        ok = len(stored) == comments and in_order and post["comment_count"] == comments
+        print("OK" if ok else "FAILED")
+    finally:
+        await db.comments.delete_many({"post_id": post_id})
+        await db.posts.delete_one({"post_id": post_id})
+        get_client().close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--comments", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--flush-ms", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.comments, args.batch_size, args.flush_ms))
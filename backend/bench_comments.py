@@ -0,0 +1,98 @@
+"""Large-thread benchmark for comment reads against the configured MongoDB.
+
+Usage:
+    python bench_comments.py [--comments 50000] [--runs 5]
+
+Seeds a scratch post with a thread of comments, then times GET /posts/{post_id}/comments
+in-process through httpx's ASGI transport: the first page, a keyset page near the end of
+the thread (before= the cursor of the comment at --deep-fraction), and stream=true for
+the whole thread as NDJSON. A keyset page should cost the same wherever it starts. The
+scratch post and its comments are removed.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from server import app, db, encode_cursor, get_client
+
+SEED_BATCH_SIZE = 1000
+
+async def seed(post_id: str, comments: int):
+    start = datetime.now(timezone.utc) - timedelta(milliseconds=comments)
+    now = datetime.now(timezone.utc)
+    await db.posts.insert_one({"post_id": post_id, "title": "Comment read bench", "content": "", "tags": [],
+                               "published": False, "comment_count": comments, "created_at": now, "updated_at": now})
+    batch = []
+    for i in range(comments):
+        batch.append({
+            "comment_id": f"comment_{i:012d}",
+            "post_id": post_id,
+            "content": f"Thread comment {i} " + "lorem ipsum " * 10,
+            "author_name": "Bench",
+            "author_email": None,
+            "created_at": start + timedelta(milliseconds=i)
+        })
+        if len(batch) >= SEED_BATCH_SIZE:
+            await db.comments.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await db.comments.insert_many(batch, ordered=False)
+
+async def timed(client: httpx.AsyncClient, url: str, runs: int) -> tuple:
+    """Median ms over runs, plus the last response."""
+    times = []
+    for _ in range(runs):
+        begin = time.perf_counter()
+        response = await client.get(url)
+        times.append((time.perf_counter() - begin) * 1000)
+        response.raise_for_status()
+    return statistics.median(times), response
+
+async def run(comments: int, runs: int, limit: int, deep_fraction: float):
+    post_id = f"post_bench_{uuid.uuid4().hex[:8]}"
+    try:
+        seed_start = time.perf_counter()
+        await seed(post_id, comments)
+        print(f"seeded {comments} comments in {time.perf_counter() - seed_start:.1f} s")
+
+        # Cursor of the comment at deep_fraction of the way down the newest-first thread
+        offset = int(comments * deep_fraction)
+        deep = await db.comments.find({"post_id": post_id}, {"_id": 0, "comment_id": 1, "created_at": 1}).sort(
+            [("created_at", -1), ("comment_id", -1)]).skip(offset).limit(1).to_list(1)
+        deep_cursor = encode_cursor(deep[0]["created_at"], deep[0]["comment_id"])
+
+        base = f"/api/posts/{post_id}/comments"
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            first_ms, first = await timed(client, f"{base}?limit={limit}", runs)
+            deep_ms, deep_page = await timed(client, f"{base}?limit={limit}&before={deep_cursor}", runs)
+
+            # httpx's ASGI transport buffers the body, so this is the time to serve the whole thread
+            stream_ms, streamed = await timed(client, f"{base}?stream=true", runs)
+            lines = streamed.content.count(b"\n")
+
+        print(f"\n{comments}-comment thread, page size {limit} (median of {runs}):")
+        print(f"  first page                {first_ms:8.1f} ms  ({len(first.json()['items'])} items)")
+        print(f"  keyset page at {offset:>7}  {deep_ms:8.1f} ms  ({len(deep_page.json()['items'])} items)")
+        print(f"  stream=true whole thread  {stream_ms:8.1f} ms  ({lines} comments, "
+              f"{len(streamed.content) / 1024 / 1024:.1f} MiB, {lines / stream_ms * 1000:.0f} comments/s)")
+        ok = lines == comments and len(deep_page.json()["items"]) == min(limit, comments - offset - 1)
+        print("OK" if ok else "FAILED")
+    finally:
+        await db.comments.delete_many({"post_id": post_id})
+        await db.posts.delete_one({"post_id": post_id})
+        get_client().close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--comments", type=int, default=50000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--deep-fraction", type=float, default=0.9)
+    args = parser.parse_args()
+    asyncio.run(run(args.comments, args.runs, args.limit, args.deep_fraction))
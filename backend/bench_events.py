@@ -0,0 +1,68 @@
+"""Load test: thousands of idle subscribers on one post, in a single worker.
+
+Usage:
+    python bench_events.py [--subscribers 5000] [--events 50]
+
+Each subscriber is a task parked on its queue the way an idle SSE connection is. Reports
+memory per idle subscriber and how long one publish takes to reach every subscriber.
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from server import EventBus
+
+async def consume(subscription, expected: int, done: asyncio.Event, received: list):
+    for _ in range(expected):
+        await subscription.queue.get()
+    received.append(time.perf_counter())
+    done.set()
+
+async def run(subscribers: int, events: int, queue_size: int):
+    bus = EventBus(queue_size)
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    received = []
+    dones = []
+    tasks = []
+    for _ in range(subscribers):
+        done = asyncio.Event()
+        subscription = bus.subscribe("post:bench")
+        tasks.append(asyncio.create_task(consume(subscription, events, done, received)))
+        dones.append(done)
+    await asyncio.sleep(0)  # let every consumer park on its queue
+
+    idle = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    print(f"{subscribers} idle subscribers: {idle / 1024 / 1024:.1f} MiB ({idle / subscribers:.0f} B each)")
+
+    comment = {"comment_id": "comment_000000000001", "post_id": "post_bench", "content": "Hello " * 20,
+               "author_name": "Bench", "created_at": "2026-01-01T00:00:00+00:00"}
+    publish_times = []
+    start = time.perf_counter()
+    for _ in range(events):
+        publish_start = time.perf_counter()
+        bus.publish("post:bench", "comment.created", comment)
+        publish_times.append((time.perf_counter() - publish_start) * 1000)
+        await asyncio.sleep(0)
+    await asyncio.gather(*(done.wait() for done in dones))
+    elapsed = (max(received) - start) * 1000
+
+    publish_times.sort()
+    print(f"publish (fan-out to all queues): p50 {publish_times[len(publish_times) // 2]:.2f} ms, "
+          f"max {publish_times[-1]:.2f} ms")
+    print(f"{events} events delivered to all subscribers in {elapsed:.1f} ms")
+    print(bus.stats())
+
+    for task in tasks:
+        task.cancel()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=50)
+    parser.add_argument("--queue-size", type=int, default=64)
+    args = parser.parse_args()
+    asyncio.run(run(args.subscribers, args.events, args.queue_size))
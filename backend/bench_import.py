@@ -0,0 +1,102 @@
+"""Bulk import/export benchmark on a synthetic NDJSON dump.
+
+Usage:
+    python bench_import.py [--posts 100000] [--comments-per-post 2] [--db blog_bench_import]
+
+Imports a generated dump into a scratch database (dropped afterwards; never the app's
+DB_NAME) through the same import_lines path POST /admin/import uses, including batched
+rendering, then times the single comment-count and tag rebuild the endpoint runs after
+it, and streams everything back out through export_records.
+"""
+import argparse
+import asyncio
+import json
+import random
+import resource
+import time
+from datetime import datetime, timedelta, timezone
+
+import server
+
+WORDS = ["async", "python", "mongo", "cursor", "index", "render", "stream", "batch", "cache", "event",
+         "queue", "tag", "post", "comment", "import", "export", "latency", "throughput", "worker", "pool"]
+TAGS = [f"tag-{i}" for i in range(200)]
+
+async def dump_lines(posts: int, comments_per_post: int):
+    """The NDJSON an export would produce, generated lazily like a request body."""
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+    for i in range(posts):
+        post_id = f"post_{i:012d}"
+        created_at = now - timedelta(minutes=i)
+        paragraphs = [" ".join(rng.choice(WORDS) for _ in range(40)) for _ in range(4)]
+        content = f"# Post {i}\n\n" + "\n\n".join(f"Some **{rng.choice(WORDS)}** text: {p}" for p in paragraphs)
+        yield server.ndjson_line("post", {
+            "post_id": post_id,
+            "title": " ".join(rng.choice(WORDS) for _ in range(5)).capitalize(),
+            "content": content,
+            "tags": rng.sample(TAGS, 3),
+            "published": True,
+            "created_at": created_at
+        })
+        for j in range(comments_per_post):
+            yield server.ndjson_line("comment", {
+                "comment_id": f"comment_{i:012d}_{j}",
+                "post_id": post_id,
+                "content": " ".join(rng.choice(WORDS) for _ in range(20)),
+                "author_name": "Bench",
+                "created_at": created_at + timedelta(seconds=j + 1)
+            })
+
+async def run(posts: int, comments_per_post: int, db_name: str):
+    if db_name == server.DB_NAME:
+        raise SystemExit(f"--db must not be the app database ({server.DB_NAME}); it is dropped afterwards")
+    server.db = server.LazyDatabase(db_name)
+    author = {"user_id": "user_bench", "name": "Bench"}
+
+    try:
+        await server.create_indexes()
+        lines = posts * (1 + comments_per_post)
+
+        start = time.perf_counter()
+        summary = await server.import_lines(dump_lines(posts, comments_per_post), author)
+        imported = time.perf_counter() - start
+        start = time.perf_counter()
+        await server.recount_comments()
+        recounted = time.perf_counter() - start
+        start = time.perf_counter()
+        await server.reconcile_tags()
+        reconciled = time.perf_counter() - start
+
+        start = time.perf_counter()
+        exported_lines = 0
+        exported_bytes = 0
+        async for line in server.export_records(["posts", "comments"]):
+            exported_lines += 1
+            exported_bytes += len(line)
+        exported = time.perf_counter() - start
+
+        total = imported + recounted + reconciled
+        print(f"import {lines} lines ({posts} posts): {imported:.1f} s ({lines / imported:.0f} lines/s, "
+              f"{posts / imported:.0f} posts/s incl. rendering)")
+        print(f"  recount comments {recounted:.1f} s, reconcile tags {reconciled:.1f} s, total {total:.1f} s")
+        print(f"  summary: {json.dumps({k: v for k, v in summary.items() if k != 'errors'})}")
+        print(f"export {exported_lines} lines, {exported_bytes / 1024 / 1024:.1f} MiB: {exported:.1f} s "
+              f"({exported_lines / exported:.0f} lines/s)")
+        # ru_maxrss is KiB on Linux
+        print(f"peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+        ok = summary["posts"] == posts and summary["comments"] == posts * comments_per_post and exported_lines == lines
+        print("OK" if ok else "FAILED")
+    finally:
+        await server.get_client().drop_database(db_name)
+        server.get_client().close()
+        for pool in server.WORKER_POOLS:
+            pool.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--comments-per-post", type=int, default=2)
+    parser.add_argument("--db", default="blog_bench_import")
+    args = parser.parse_args()
+    asyncio.run(run(args.posts, args.comments_per_post, args.db))
@@ -0,0 +1,117 @@
+"""Search benchmark: the $text index against the search_terms prefix fallback on a seeded corpus.
+
+Usage:
+    python bench_search.py [--posts 100000] [--runs 5] [--db blog_bench_search]
+
+Seeds a scratch database (dropped afterwards; never the app's DB_NAME) with synthetic
+published posts, builds the app's indexes, then times for a few kinds of query:
+  - probe: build_posts_query, i.e. the $text find_one that picks text or prefix mode
+  - page:  the first 10 results with the filter the probe picked, sorted the way get_posts does
+  - text / prefix: the page query forced to each mode, for comparison
+A search costs probe + page.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from pymongo import DESCENDING
+
+import server
+
+SEED_BATCH_SIZE = 1000
+SYLLABLES = ["ka", "lo", "mi", "ren", "tor", "vel", "sun", "dar", "pi", "que", "zan", "bel", "cor", "fi", "gra",
+             "hol", "ist", "jun", "mar", "nex", "ost", "pra", "rus", "sta", "tem", "ul", "vor", "wen", "yal", "zer"]
+TAGS = [f"{a}{b}" for a in SYLLABLES[:10] for b in SYLLABLES[10:20]]
+
+def vocabulary(rng: random.Random, size: int) -> list:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+async def seed(posts: int, words: list, rng: random.Random):
+    now = datetime.now(timezone.utc)
+    batch = []
+    for i in range(posts):
+        title = " ".join(rng.choice(words) for _ in range(rng.randint(3, 8))).capitalize()
+        tags = rng.sample(TAGS, rng.randint(1, 3))
+        content = " ".join(rng.choice(words) for _ in range(60))
+        created_at = now - timedelta(minutes=i)
+        batch.append({
+            "post_id": f"post_{i:012d}",
+            "title": title,
+            "content": content,
+            "preview": content[:200],
+            "tags": tags,
+            "search_terms": server.search_terms(title, tags),
+            "author_id": "user_bench",
+            "author_name": "Bench",
+            "published": True,
+            "comment_count": 0,
+            "created_at": created_at,
+            "updated_at": created_at
+        })
+        if len(batch) >= SEED_BATCH_SIZE:
+            await server.db.posts.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await server.db.posts.insert_many(batch, ordered=False)
+
+async def first_page(query: dict) -> list:
+    # Same projection and order as get_posts in page mode
+    projection = server.summary_projection(None)
+    sort = [("created_at", DESCENDING), ("post_id", DESCENDING)]
+    if "$text" in query:
+        projection["score"] = {"$meta": "textScore"}
+        sort = [("score", {"$meta": "textScore"})] + sort
+    return await server.db.posts.find(query, projection).sort(sort).limit(10).to_list(10)
+
+async def median_ms(runs: int, make) -> tuple:
+    times = []
+    for _ in range(runs):
+        begin = time.perf_counter()
+        result = await make()
+        times.append((time.perf_counter() - begin) * 1000)
+    return statistics.median(times), result
+
+async def run(posts: int, runs: int, db_name: str):
+    if db_name == server.DB_NAME:
+        raise SystemExit(f"--db must not be the app database ({server.DB_NAME}); it is dropped afterwards")
+    server.db = server.LazyDatabase(db_name)
+    rng = random.Random(42)
+    words = vocabulary(rng, 5000)
+
+    try:
+        start = time.perf_counter()
+        await seed(posts, words, rng)
+        print(f"seeded {posts} posts in {time.perf_counter() - start:.1f} s")
+        start = time.perf_counter()
+        await server.create_indexes()
+        print(f"built indexes in {time.perf_counter() - start:.1f} s")
+
+        picks = rng.sample(words, 3)
+        queries = [("word", w) for w in picks] + [("prefix", w[:3]) for w in picks] + \
+                  [("tag prefix", TAGS[0][:4]), ("two prefixes", f"{picks[0][:3]} {picks[1][:3]}"), ("no match", "qqzx")]
+
+        print(f"\n{'kind':<13}{'search':<16}{'mode':<8}{'hits':>5}{'probe':>10}{'page':>10}{'text':>10}{'prefix':>10}  (ms, median of {runs})")
+        for kind, search in queries:
+            probe_ms, query = await median_ms(runs, lambda: server.build_posts_query(None, None, search))
+            page_ms, page = await median_ms(runs, lambda: first_page(query))
+            text_ms, _ = await median_ms(runs, lambda: first_page({"published": True, "$text": {"$search": search}}))
+            prefix_ms, _ = await median_ms(runs, lambda: first_page({"published": True, **server.prefix_search_filter(search)}))
+            mode = "text" if "$text" in query else "prefix"
+            print(f"{kind:<13}{search:<16}{mode:<8}{len(page):>5}{probe_ms:>10.1f}{page_ms:>10.1f}{text_ms:>10.1f}{prefix_ms:>10.1f}")
+    finally:
+        await server.get_client().drop_database(db_name)
+        server.get_client().close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--db", default="blog_bench_search")
+    args = parser.parse_args()
+    asyncio.run(run(args.posts, args.runs, args.db))
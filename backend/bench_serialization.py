@@ -0,0 +1,72 @@
+"""Microbenchmark: response serialization for post listings of 10/100/1000 posts.
+
+Usage:
+    python bench_serialization.py
+
+Compares FastAPI's default path (re-validate against response_model, jsonable_encoder,
+stdlib json) with model_response (one pydantic-core validate + dump_json), plus orjson
+when it is installed.
+"""
+import json
+import time
+from datetime import datetime, timezone
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+
+from server import PostSummary, type_adapter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def make_posts(count: int) -> list:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "post_id": f"post_{i:012d}",
+            "title": f"Post number {i}",
+            "preview": "A short preview of the post body that PostCard renders. " * 3,
+            "tags": ["python", "fastapi", "mongodb"],
+            "author_id": "user_000000000001",
+            "author_name": "Author",
+            "published": True,
+            "created_at": now,
+            "updated_at": now,
+            "comment_count": i % 7,
+        }
+        for i in range(count)
+    ]
+
+def standard_path(posts: list) -> bytes:
+    # What FastAPI does with a returned list of dicts and response_model=List[PostSummary]
+    validated = type_adapter(List[PostSummary]).validate_python(posts)
+    content = jsonable_encoder(validated, exclude_none=True)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+def fast_path(posts: list) -> bytes:
+    adapter = type_adapter(List[PostSummary])
+    return adapter.dump_json(adapter.validate_python(posts), exclude_none=True)
+
+def orjson_path(posts: list) -> bytes:
+    adapter = type_adapter(List[PostSummary])
+    return orjson.dumps(adapter.dump_python(adapter.validate_python(posts), mode="json", exclude_none=True))
+
+def timed(func, posts: list, rounds: int) -> float:
+    func(posts)  # warm up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(posts)
+    return (time.perf_counter() - start) * 1000 / rounds
+
+if __name__ == "__main__":
+    paths = [("standard", standard_path), ("model_response", fast_path)]
+    if orjson is not None:
+        paths.append(("orjson", orjson_path))
+
+    for count in (10, 100, 1000):
+        posts = make_posts(count)
+        rounds = max(10, 10000 // count)
+        results = ", ".join(f"{label} {timed(func, posts, rounds):.3f} ms" for label, func in paths)
+        print(f"{count:>5} posts: {results}")
@@ -0,0 +1,83 @@
+"""Cold-start benchmark: import-time breakdown and time to first request.
+
+Usage:
+    python bench_startup.py [--runs 5] [--path /api/] [--top 15]
+
+Every run is a fresh interpreter. The import breakdown comes from `python -X importtime`
+(top-level imports of server.py, by cumulative time). Time to first request is the
+import of server plus one request served in-process through httpx's ASGI transport;
+startup hooks are not run, so paths that need MongoDB require a reachable MONGO_URL.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent
+
+FIRST_REQUEST = """
+import asyncio, json, time
+start = time.perf_counter()
+import server
+imported = time.perf_counter()
+import httpx
+
+async def first_request():
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        begin = time.perf_counter()
+        response = await client.get({path!r})
+        return response.status_code, time.perf_counter() - begin
+
+status, request_time = asyncio.run(first_request())
+print(json.dumps({{"import_ms": (imported - start) * 1000, "request_ms": request_time * 1000, "status": status}}))
+"""
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+
+def import_breakdown(top: int):
+    # stderr lines: "import time: self [us] | cumulative | imported package", nesting shown by indent
+    modules = []
+    total = 0
+    for line in run_python("-X", "importtime", "-c", "import server").stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        if name.strip() == "server":
+            total = int(cumulative)
+        elif depth == 1:
+            modules.append((int(cumulative), name.strip()))
+
+    print(f"import server: {total / 1000:.1f} ms")
+    for cumulative, name in sorted(modules, reverse=True)[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+def first_request(runs: int, path: str):
+    results = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = run_python("-c", FIRST_REQUEST.format(path=path)).stdout
+        wall = (time.perf_counter() - start) * 1000
+        results.append({**json.loads(output.strip().splitlines()[-1]), "wall_ms": wall})
+
+    def median(key: str) -> float:
+        return statistics.median(result[key] for result in results)
+
+    print(f"\nfirst request to {path} (median of {runs}, status {results[-1]['status']}):")
+    print(f"  import server     {median('import_ms'):8.1f} ms")
+    print(f"  first request     {median('request_ms'):8.1f} ms")
+    print(f"  process wall time {median('wall_ms'):8.1f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/api/")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    import_breakdown(args.top)
+    first_request(args.runs, args.path)
@@ -0,0 +1,110 @@
+"""One-shot migration: convert ISO-8601 timestamp strings to native BSON dates.
+
+Usage:
+    python migrate_datetimes.py              # migrate every collection in batches
+    python migrate_datetimes.py --dry-run    # only count documents that still need converting
+    python migrate_datetimes.py --benchmark  # time list serialization, string vs native timestamps
+
+Safe to re-run: only documents whose fields are still strings are touched.
+"""
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+DATETIME_FIELDS = {
+    "posts": ["created_at", "updated_at", "comments_updated_at"],
+    "comments": ["created_at"],
+    "users": ["created_at"],
+    "user_sessions": ["created_at", "expires_at"],
+}
+
+def parse_timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+async def migrate_collection(db, collection: str, fields: list, batch_size: int, dry_run: bool) -> int:
+    string_filter = {"$or": [{field: {"$type": "string"}} for field in fields]}
+    if dry_run:
+        return await db[collection].count_documents(string_filter)
+
+    migrated = 0
+    operations = []
+    projection = {"_id": 1, **{field: 1 for field in fields}}
+    # Streams the cursor; memory stays bounded by batch_size regardless of collection size
+    async for doc in db[collection].find(string_filter, projection).batch_size(batch_size):
+        updates = {field: parse_timestamp(doc[field]) for field in fields if isinstance(doc.get(field), str)}
+        operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": updates}))
+        if len(operations) >= batch_size:
+            await db[collection].bulk_write(operations, ordered=False)
+            migrated += len(operations)
+            operations = []
+    if operations:
+        await db[collection].bulk_write(operations, ordered=False)
+        migrated += len(operations)
+    return migrated
+
+async def migrate(batch_size: int, dry_run: bool):
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    try:
+        for collection, fields in DATETIME_FIELDS.items():
+            count = await migrate_collection(db, collection, fields, batch_size, dry_run)
+            action = "need converting" if dry_run else "converted"
+            print(f"{collection}: {count} documents {action}")
+    finally:
+        client.close()
+
+def benchmark(posts: int = 1000, rounds: int = 20):
+    """Compare the old per-document fromisoformat loop against native datetimes."""
+    from server import PostResponse
+
+    now = datetime.now(timezone.utc)
+    base = {
+        "title": "Title", "content": "Body", "content_html": "<p>Body</p>", "preview": "Body",
+        "tags": ["a", "b"], "author_id": "user_1", "author_name": "Author", "published": True,
+    }
+    native_docs = [{**base, "post_id": f"post_{i}", "created_at": now, "updated_at": now} for i in range(posts)]
+    string_docs = [{**doc, "created_at": now.isoformat(), "updated_at": now.isoformat()} for doc in native_docs]
+
+    def serialize_strings():
+        docs = [dict(doc) for doc in string_docs]
+        for doc in docs:
+            if isinstance(doc.get("created_at"), str):
+                doc["created_at"] = datetime.fromisoformat(doc["created_at"])
+            if isinstance(doc.get("updated_at"), str):
+                doc["updated_at"] = datetime.fromisoformat(doc["updated_at"])
+        return [PostResponse(**doc).model_dump_json() for doc in docs]
+
+    def serialize_native():
+        return [PostResponse(**doc).model_dump_json() for doc in native_docs]
+
+    for label, func in (("iso strings", serialize_strings), ("native datetimes", serialize_native)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            func()
+        elapsed = (time.perf_counter() - start) * 1000 / rounds
+        print(f"{label}: {elapsed:.2f} ms per {posts}-post list")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark()
+    else:
+        asyncio.run(migrate(args.batch_size, args.dry_run))
@@ -1,47 +1,245 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, Response
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.security import HTTPBearer
 from dotenv import load_dotenv
+from fastapi.responses import JSONResponse, StreamingResponse
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, TEXT, DeleteMany, IndexModel, ReadPreference, ReturnDocument, UpdateOne, monitoring
+from pymongo.errors import BulkWriteError, ConnectionFailure, OperationFailure, WriteConcernError
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from typing import List, Optional
 import uuid
+import re
+import json
+import base64
+import time
+import hashlib
+from collections import Counter, OrderedDict
+from email.utils import format_datetime, parsedate_to_datetime
+from urllib.parse import urlencode
+import asyncio
+import threading
+from functools import lru_cache
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from datetime import datetime, timezone, timedelta
-import bcrypt
-import jwt
-import httpx
-import markdown
-import bleach
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# ============== MONGO CLIENT ==============
+
+# Client options taken from the environment when set; anything unset keeps the driver default
+MONGO_CLIENT_OPTIONS = [
+    ("MONGO_MAX_POOL_SIZE", "maxPoolSize", int),
+    ("MONGO_MIN_POOL_SIZE", "minPoolSize", int),
+    ("MONGO_MAX_IDLE_TIME_MS", "maxIdleTimeMS", int),
+    ("MONGO_WAIT_QUEUE_TIMEOUT_MS", "waitQueueTimeoutMS", int),
+    ("MONGO_SERVER_SELECTION_TIMEOUT_MS", "serverSelectionTimeoutMS", int),
+    ("MONGO_CONNECT_TIMEOUT_MS", "connectTimeoutMS", int),
+    ("MONGO_SOCKET_TIMEOUT_MS", "socketTimeoutMS", int),
+    ("MONGO_COMPRESSORS", "compressors", str),  # e.g. "zstd,snappy,zlib"; zstd/snappy need their packages
+    ("MONGO_ZLIB_COMPRESSION_LEVEL", "zlibCompressionLevel", int),
+]
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+# Public (published-only) listings tolerate replica lag; admin views and single-post reads stay on primary
+MONGO_LISTING_READ_PREFERENCE = os.environ.get('MONGO_LISTING_READ_PREFERENCE', 'primary')
+if MONGO_LISTING_READ_PREFERENCE not in READ_PREFERENCES:
+    logger.warning(f"Unknown MONGO_LISTING_READ_PREFERENCE={MONGO_LISTING_READ_PREFERENCE}; using primary")
+    MONGO_LISTING_READ_PREFERENCE = "primary"
+
+class MongoMetrics(monitoring.CommandListener, monitoring.ConnectionPoolListener):
+    """Pool and command instrumentation; callbacks arrive on the driver's worker threads."""
+
+    LATENCY_SAMPLES = 1000
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.in_use = 0
+        self.max_in_use = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.checkout_wait_ms = 0.0
+        self.max_checkout_wait_ms = 0.0
+        self.pools_cleared = 0
+        self.commands = {}
+
+    # Pool: a checkout starts and ends on the same thread, so a thread-local start time pairs them
+    def connection_check_out_started(self, event):
+        self.local.checkout_started = time.perf_counter()
+
+    def _checkout_wait(self) -> float:
+        return (time.perf_counter() - getattr(self.local, "checkout_started", time.perf_counter())) * 1000
+
+    def connection_checked_out(self, event):
+        wait = self._checkout_wait()
+        with self.lock:
+            self.checkouts += 1
+            self.checkout_wait_ms += wait
+            self.max_checkout_wait_ms = max(self.max_checkout_wait_ms, wait)
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+
+    def connection_check_out_failed(self, event):
+        self._checkout_wait()
+        with self.lock:
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self.lock:
+            self.in_use -= 1
+
+    def pool_cleared(self, event):
+        with self.lock:
+            self.pools_cleared += 1
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_created(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_closed(self, event): pass
+
+    # Commands
+    def started(self, event): pass
+
+    def _record(self, event, failed: bool):
+        elapsed = event.duration_micros / 1000
+        with self.lock:
+            stats = self.commands.get(event.command_name)
+            if stats is None:
+                stats = self.commands[event.command_name] = {
+                    "count": 0, "failures": 0, "total_ms": 0.0, "max_ms": 0.0, "samples": []
+                }
+            stats["count"] += 1
+            stats["failures"] += failed
+            stats["total_ms"] += elapsed
+            stats["max_ms"] = max(stats["max_ms"], elapsed)
+            samples = stats["samples"]
+            if len(samples) < self.LATENCY_SAMPLES:
+                samples.append(elapsed)
+            else:
+                samples[stats["count"] % self.LATENCY_SAMPLES] = elapsed
+
+    def succeeded(self, event):
+        self._record(event, failed=False)
+
+    def failed(self, event):
+        self._record(event, failed=True)
+
+    def stats(self) -> dict:
+        with self.lock:
+            commands = {}
+            for name, stats in self.commands.items():
+                samples = sorted(stats["samples"])
+                commands[name] = {
+                    "count": stats["count"],
+                    "failures": stats["failures"],
+                    "avg_ms": stats["total_ms"] / stats["count"],
+                    "p50_ms": samples[len(samples) // 2],
+                    "p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+                    "max_ms": stats["max_ms"]
+                }
+            return {
+                "pool": {
+                    "in_use": self.in_use,
+                    "max_in_use": self.max_in_use,
+                    "checkouts": self.checkouts,
+                    "checkout_failures": self.checkout_failures,
+                    "avg_checkout_wait_ms": self.checkout_wait_ms / self.checkouts if self.checkouts else 0.0,
+                    "max_checkout_wait_ms": self.max_checkout_wait_ms,
+                    "pools_cleared": self.pools_cleared
+                },
+                "commands": commands
+            }
+
+def mongo_client_options() -> dict:
+    # tz_aware so BSON dates come back as UTC-aware datetimes, ready for the response models
+    options = {"tz_aware": True}
+    for env_name, option, cast in MONGO_CLIENT_OPTIONS:
+        value = os.environ.get(env_name)
+        if value:
+            options[option] = cast(value)
+    return options
+
+mongo_metrics = MongoMetrics()
+
+# MongoDB connection, opened on first use: importing the app (or a cold start serving only
+# cached responses) skips Motor's import and the driver's background monitor threads
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+DB_NAME = os.environ['DB_NAME']
+_client = None
+
+def get_client():
+    global _client
+    if _client is None:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        _client = AsyncIOMotorClient(mongo_url, event_listeners=[mongo_metrics], **mongo_client_options())
+    return _client
+
+class LazyDatabase:
+    """Stands in for client[DB_NAME] until a collection is first touched."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.database = None
+
+    def _resolve(self):
+        if self.database is None:
+            self.database = get_client()[self.name]
+        return self.database
+
+    def __getattr__(self, attr: str):
+        return getattr(self._resolve(), attr)
+
+    def __getitem__(self, collection: str):
+        return self._resolve()[collection]
+
+db = LazyDatabase(DB_NAME)
+
+def listing_posts(query: dict):
+    """posts collection for a listing read; published-only queries may go to a secondary."""
+    if query.get("published") is True and MONGO_LISTING_READ_PREFERENCE != "primary":
+        return db.posts.with_options(read_preference=READ_PREFERENCES[MONGO_LISTING_READ_PREFERENCE])
+    return db.posts
+
+# Multi-document transactions need a replica set; enable where the deployment has one
+MONGO_TRANSACTIONS = os.environ.get('MONGO_TRANSACTIONS', 'false').lower() == 'true'
 
 # JWT Config
 JWT_SECRET = os.environ.get('JWT_SECRET', 'your-secret-key-change-in-production')
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24 * 7  # 7 days
 
-# Create the main app
-app = FastAPI()
+# Serialization: "fast" encodes validated models straight to JSON bytes, "standard" defers to FastAPI
+JSON_RESPONSE_MODE = os.environ.get('JSON_RESPONSE_MODE', 'fast')
+
+try:
+    import orjson  # noqa: F401 - optional, ORJSONResponse needs it at render time
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:
+    FastJSONResponse = JSONResponse
 
 # Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+api_router = APIRouter(prefix="/api", default_response_class=FastJSONResponse)
 
 # Security
 security = HTTPBearer(auto_error=False)
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-logger = logging.getLogger(__name__)
-
 # ============== MODELS ==============
 
 class UserCreate(BaseModel):
@@ -74,6 +272,14 @@ class PostUpdate(BaseModel):
     preview: Optional[str] = None
     tags: Optional[List[str]] = None
     published: Optional[bool] = None
+    # Optimistic concurrency: reject the edit with 409 if the post changed since this was read
+    expected_updated_at: Optional[datetime] = None
+
+class BulkPostOperation(BaseModel):
+    post_ids: List[str]
+    operation: str  # publish | unpublish | delete | retag
+    add_tags: List[str] = []
+    remove_tags: List[str] = []
 
 class PostResponse(BaseModel):
     post_id: str
@@ -89,10 +295,13 @@ class PostResponse(BaseModel):
     updated_at: datetime
     comment_count: int = 0
 
+COMMENT_MAX_CONTENT_LENGTH = 10000
+COMMENT_MAX_AUTHOR_LENGTH = 100
+
 class CommentCreate(BaseModel):
-    content: str
-    author_name: str
-    author_email: Optional[str] = None
+    content: str = Field(max_length=COMMENT_MAX_CONTENT_LENGTH)
+    author_name: str = Field(max_length=COMMENT_MAX_AUTHOR_LENGTH)
+    author_email: Optional[str] = Field(default=None, max_length=254)
 
 class CommentResponse(BaseModel):
     comment_id: str
@@ -101,16 +310,811 @@ class CommentResponse(BaseModel):
     author_name: str
     created_at: datetime
 
+class PostSummary(BaseModel):
+    """List representation: everything PostCard needs, without the full body."""
+    post_id: str
+    title: str
+    preview: str
+    tags: List[str]
+    author_id: str
+    author_name: str
+    published: bool
+    created_at: datetime
+    updated_at: datetime
+    comment_count: int = 0
+    # Only present when requested with fields=
+    content: Optional[str] = None
+    content_html: Optional[str] = None
+
+class PostListResponse(BaseModel):
+    items: List[PostSummary]
+    total: int
+    page: int
+    limit: int
+    pages: int
+    total_is_approximate: bool = False
+
+class CommentPage(BaseModel):
+    items: List[CommentResponse]
+    comment_count: int
+    next_cursor: Optional[str] = None
+
+class TagPostRef(BaseModel):
+    post_id: str
+    title: str
+    created_at: datetime
+
 class TagResponse(BaseModel):
     name: str
     count: int
+    last_used_at: Optional[datetime] = None
+    latest_posts: List[TagPostRef] = []
+
+@lru_cache(maxsize=None)
+def type_adapter(model_type) -> TypeAdapter:
+    return TypeAdapter(model_type)
+
+def model_response(model_type, content, response: Optional[Response] = None, exclude_none: bool = False):
+    """Validate DB documents once and encode them to JSON in pydantic-core.
+
+    Returning a Response skips FastAPI's second validation pass against response_model,
+    which is still declared on the route for the OpenAPI schema.
+    """
+    if JSON_RESPONSE_MODE != "fast":
+        return content
+    adapter = type_adapter(model_type)
+    body = adapter.dump_json(adapter.validate_python(content), exclude_none=exclude_none)
+    headers = dict(response.headers) if response is not None else None
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# ============== INDEXES ==============
+
+INDEXES = {
+    "posts": [
+        IndexModel([("post_id", ASCENDING)], unique=True),
+        IndexModel([("published", ASCENDING), ("created_at", DESCENDING), ("post_id", DESCENDING)]),
+        IndexModel([("tags", ASCENDING), ("created_at", DESCENDING), ("post_id", DESCENDING)]),
+        IndexModel([("created_at", DESCENDING), ("post_id", DESCENDING)]),
+        IndexModel([("search_terms", ASCENDING)]),
+        IndexModel(
+            [("title", TEXT), ("tags", TEXT), ("content", TEXT)],
+            weights={"title": 10, "tags": 5, "content": 1},
+            name="posts_text"
+        ),
+    ],
+    "comments": [
+        IndexModel([("comment_id", ASCENDING)], unique=True),
+        IndexModel([("post_id", ASCENDING), ("created_at", DESCENDING), ("comment_id", DESCENDING)]),
+    ],
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("user_id", ASCENDING)], unique=True),
+    ],
+    "user_sessions": [
+        IndexModel([("session_token", ASCENDING)], unique=True),
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "tags": [
+        IndexModel([("name", ASCENDING)], unique=True),
+        IndexModel([("count", DESCENDING)]),
+        IndexModel([("latest_posts.post_id", ASCENDING)]),
+    ],
+}
+
+# (route, collection, filter, sort) for the explain report
+QUERY_SHAPES = [
+    ("GET /posts", "posts", {"published": True}, [("created_at", DESCENDING)]),
+    ("GET /posts?tag=", "posts", {"published": True, "tags": "example"}, [("created_at", DESCENDING)]),
+    ("GET /posts/{post_id}", "posts", {"post_id": "example"}, None),
+    ("GET /posts?search= (prefix)", "posts", {"published": True, "search_terms": {"$regex": "^exam"}},
+     [("created_at", DESCENDING)]),
+    ("GET /posts/{post_id}/comments", "comments", {"post_id": "example"},
+     [("created_at", DESCENDING), ("comment_id", DESCENDING)]),
+    ("POST /auth/login", "users", {"email": "example"}, None),
+    ("get_current_user (jwt)", "users", {"user_id": "example"}, None),
+    ("get_current_user (session)", "user_sessions", {"session_token": "example"}, None),
+    ("GET /tags", "tags", {"count": {"$gt": 0}}, [("count", DESCENDING)]),
+]
+
+async def create_indexes():
+    # create_indexes is a no-op for indexes that already exist, so this is safe on every boot
+    for collection, indexes in INDEXES.items():
+        try:
+            await db[collection].create_indexes(indexes)
+        except OperationFailure as e:
+            logger.warning(f"Could not create indexes on {collection}: {e}")
+
+# ============== HTTP CACHING ==============
+
+# Public reads revalidate every time (cheap 304s); tags tolerate a minute of staleness
+CACHE_POLICIES = {
+    "post": "public, max-age=0, must-revalidate",
+    "posts": "public, max-age=0, must-revalidate",
+    "comments": "public, max-age=0, must-revalidate",
+    "tags": "public, max-age=60",
+    "private": "private, no-cache",
+}
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha256(json.dumps(parts, default=str, separators=(",", ":")).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+def latest_modified(*values) -> Optional[datetime]:
+    latest = None
+    for value in values:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        if value is None:
+            continue
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        if latest is None or value > latest:
+            latest = value
+    return latest
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        # If-None-Match uses weak comparison and takes precedence over If-Modified-Since
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates
+    
+    if_modified_since = request.headers.get("If-Modified-Since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    
+    return False
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    etag: str,
+    cache_control: str,
+    last_modified: Optional[datetime] = None
+) -> Optional[Response]:
+    """Set validators on the response, or return a 304 to send instead of the body."""
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Authorization, Cookie"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    if "X-Next-Cursor" in response.headers:
+        headers["X-Next-Cursor"] = response.headers["X-Next-Cursor"]
+    
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+def post_validator_parts(post: dict) -> tuple:
+    return (
+        post["post_id"],
+        post.get("updated_at"),
+        post.get("comment_count", 0),
+        post.get("comments_updated_at"),
+        post.get("published"),
+        post.get("renderer_version")
+    )
+
+# ============== RESPONSE CACHE ==============
+
+RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory')
+RESPONSE_CACHE_TTL_SECONDS = int(os.environ.get('RESPONSE_CACHE_TTL_SECONDS', '30'))
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', '1000'))
+
+# Anonymous GET routes served from the shared cache: invalidation tags and the query params the route
+# reads. Only those params go into the cache key, so junk params share the entry instead of adding one
+LISTING_PARAMS = ("page", "limit", "tag", "search", "include_unpublished", "fields")
+CACHEABLE_ROUTES = [
+    (re.compile(r"^/api/posts$"), ["posts"], LISTING_PARAMS + ("cursor", "after")),
+    (re.compile(r"^/api/posts/count$"), ["posts"], ("tag", "search")),
+    (re.compile(r"^/api/posts/listing$"), ["posts"], LISTING_PARAMS + ("approximate_total",)),
+    (re.compile(r"^/api/posts/(?P<post_id>[^/]+)$"), ["post:{post_id}"], ()),
+    (re.compile(r"^/api/tags$"), ["tags"], ()),
+]
+
+class MemoryResponseBackend:
+    """In-process LRU with per-entry TTL; entries: {key: (expires_at, value, tags)}."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.keys_by_tag = {}
+
+    def _remove(self, key: str):
+        # Every way out of entries goes through here so keys_by_tag never outgrows the LRU
+        _, _, tags = self.entries.pop(key)
+        for tag in tags:
+            keys = self.keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.keys_by_tag[tag]
+
+    async def get(self, key: str) -> Optional[dict]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self._remove(key)
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    async def set(self, key: str, value: dict, ttl: int, tags: List[str]):
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = (time.monotonic() + ttl, value, tuple(tags))
+        for tag in tags:
+            self.keys_by_tag.setdefault(tag, set()).add(key)
+        while len(self.entries) > self.max_size:
+            self._remove(next(iter(self.entries)))
+
+    async def invalidate(self, tags: List[str]):
+        for tag in tags:
+            for key in list(self.keys_by_tag.get(tag, ())):
+                self._remove(key)
+
+class RedisResponseBackend:
+    """Shared cache across workers; works with any client exposing the redis.asyncio API."""
+
+    def __init__(self, redis_client, prefix: str = "response_cache:"):
+        self.redis = redis_client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[dict]:
+        raw = await self.redis.get(self.prefix + key)
+        if raw is None:
+            return None
+        value = json.loads(raw)
+        value["body"] = base64.b64decode(value["body"])
+        return value
+
+    async def set(self, key: str, value: dict, ttl: int, tags: List[str]):
+        raw = json.dumps({**value, "body": base64.b64encode(value["body"]).decode()})
+        await self.redis.set(self.prefix + key, raw, ex=ttl)
+        for tag in tags:
+            await self.redis.sadd(self.prefix + "tag:" + tag, key)
+            await self.redis.expire(self.prefix + "tag:" + tag, ttl)
+
+    async def invalidate(self, tags: List[str]):
+        for tag in tags:
+            tag_key = self.prefix + "tag:" + tag
+            keys = await self.redis.smembers(tag_key)
+            if keys:
+                await self.redis.delete(*[self.prefix + (k.decode() if isinstance(k, bytes) else k) for k in keys])
+            await self.redis.delete(tag_key)
+
+class ResponseCache:
+    """Route-level cache with tag invalidation and coalescing of concurrent misses."""
+
+    def __init__(self, backend, ttl_seconds: int):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.inflight = {}
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def fetch(self, key: str, tags: List[str], produce) -> dict:
+        entry = await self.backend.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        
+        if key in self.inflight:
+            self.coalesced += 1
+            return await asyncio.shield(self.inflight[key])
+        
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        generation = self.generation
+        try:
+            entry = await produce()
+            # Skip the store if a write invalidated the cache while we were producing
+            if entry["status"] == 200 and generation == self.generation:
+                await self.backend.set(key, entry, self.ttl_seconds, tags)
+            future.set_result(entry)
+            return entry
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # consumed here when nobody else was waiting
+            raise
+        finally:
+            del self.inflight[key]
+
+    async def invalidate(self, *tags: str):
+        self.generation += 1
+        await self.backend.invalidate(list(tags))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0
+        }
+
+def create_response_backend():
+    if RESPONSE_CACHE_BACKEND == "redis":
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError:
+            logger.warning("RESPONSE_CACHE_BACKEND=redis but the redis package is not installed; using memory")
+        else:
+            return RedisResponseBackend(redis_asyncio.from_url(os.environ['REDIS_URL']))
+    return MemoryResponseBackend(RESPONSE_CACHE_SIZE)
+
+response_cache = ResponseCache(create_response_backend(), RESPONSE_CACHE_TTL_SECONDS)
+
+CONDITIONAL_HEADERS = (b"if-none-match", b"if-modified-since")
+
+def match_cacheable_route(request: Request) -> Optional[tuple]:
+    """(cache key, invalidation tags) for a cacheable route, else None."""
+    for pattern, tags, params in CACHEABLE_ROUTES:
+        match = pattern.match(request.url.path)
+        if match:
+            query = sorted((name, value) for name, value in request.query_params.multi_items() if name in params)
+            key = f"{request.url.path}?{urlencode(query)}"
+            return key, [tag.format(**match.groupdict()) for tag in tags]
+    return None
+
+def is_anonymous(request: Request) -> bool:
+    return "session_token" not in request.cookies and "authorization" not in request.headers
+
+# ============== WORKER POOLS ==============
+
+class WorkerPool:
+    """Runs blocking CPU work off the event loop with a bounded number of jobs in flight."""
+
+    def __init__(self, name: str, kind: str, workers: int, concurrency: int):
+        self.name = name
+        self.kind = kind
+        self.workers = workers
+        self.concurrency = concurrency
+        self.executor = None
+        self.semaphore = None
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.max_queued = 0
+
+    def _ensure_started(self):
+        if self.executor is None:
+            executor_cls = ProcessPoolExecutor if self.kind == "process" else ThreadPoolExecutor
+            self.executor = executor_cls(max_workers=self.workers)
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def run(self, func, *args):
+        self._ensure_started()
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.queued -= 1
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self.semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "concurrency": self.concurrency,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "in_flight": self.in_flight,
+            "completed": self.completed
+        }
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+auth_pool = WorkerPool(
+    "auth",
+    kind=os.environ.get('AUTH_POOL_KIND', 'thread'),
+    workers=int(os.environ.get('AUTH_POOL_WORKERS', '4')),
+    concurrency=int(os.environ.get('AUTH_POOL_CONCURRENCY', '8'))
+)
+render_pool = WorkerPool(
+    "render",
+    kind=os.environ.get('RENDER_POOL_KIND', 'thread'),
+    workers=int(os.environ.get('RENDER_POOL_WORKERS', '2')),
+    concurrency=int(os.environ.get('RENDER_POOL_CONCURRENCY', '4'))
+)
+WORKER_POOLS = [auth_pool, render_pool]
+
+# ============== EVENT BUS ==============
+
+EVENT_QUEUE_SIZE = int(os.environ.get('EVENT_QUEUE_SIZE', '64'))
+EVENT_HEARTBEAT_SECONDS = int(os.environ.get('EVENT_HEARTBEAT_SECONDS', '15'))
+
+class Event:
+    """One published event, encoded once and shared by every subscriber's queue."""
+
+    __slots__ = ("type", "data")
+
+    def __init__(self, event_type: str, data: bytes):
+        self.type = event_type
+        self.data = data
+
+    def sse(self) -> bytes:
+        return b"event: " + self.type.encode() + b"\ndata: " + self.data + b"\n\n"
+
+    def message(self) -> str:
+        return '{"type":"' + self.type + '","data":' + self.data.decode() + '}'
+
+RESYNC_EVENT = Event("resync", b"{}")
+
+class Subscription:
+    def __init__(self, channel: str, max_size: int):
+        self.channel = channel
+        self.queue = asyncio.Queue(maxsize=max_size)
+
+    def push(self, event: Event) -> bool:
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            # Slow consumer: drop its backlog and tell it to refetch instead of growing without bound
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_EVENT)
+            return False
+
+    async def next(self, timeout: float) -> Optional[Event]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+class EventBus:
+    """In-process fan-out of post and comment changes to per-post subscribers.
+
+    Each worker only sees writes it handled itself; run a single worker for push, or put
+    a shared broker in front when scaling out.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.channels = {}
+        self.published = 0
+        self.delivered = 0
+        self.overflows = 0
+
+    def subscribe(self, channel: str) -> Subscription:
+        subscription = Subscription(channel, self.queue_size)
+        self.channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self.channels.get(subscription.channel)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self.channels[subscription.channel]
+
+    def has_subscribers(self, channel: str) -> bool:
+        return channel in self.channels
+
+    def publish(self, channel: str, event_type: str, data: dict, model_type=dict):
+        self.published += 1
+        subscribers = self.channels.get(channel)
+        if not subscribers:
+            return
+        adapter = type_adapter(model_type)
+        event = Event(event_type, adapter.dump_json(adapter.validate_python(data)))
+        for subscription in subscribers:
+            if subscription.push(event):
+                self.delivered += 1
+            else:
+                self.overflows += 1
+
+    def stats(self) -> dict:
+        return {
+            "channels": len(self.channels),
+            "subscribers": sum(len(subscribers) for subscribers in self.channels.values()),
+            "queue_size": self.queue_size,
+            "published": self.published,
+            "delivered": self.delivered,
+            "overflows": self.overflows
+        }
+
+event_bus = EventBus(EVENT_QUEUE_SIZE)
+
+# ============== COMMENT INGESTION ==============
+
+# Write-behind: accepted comments are queued and flushed with insert_many by one background task
+COMMENT_WRITE_BEHIND = os.environ.get('COMMENT_WRITE_BEHIND', 'true').lower() == 'true'
+COMMENT_QUEUE_SIZE = int(os.environ.get('COMMENT_QUEUE_SIZE', '10000'))
+COMMENT_BATCH_SIZE = int(os.environ.get('COMMENT_BATCH_SIZE', '200'))
+COMMENT_FLUSH_MS = int(os.environ.get('COMMENT_FLUSH_MS', '50'))
+COMMENT_RATE_PER_IP = int(os.environ.get('COMMENT_RATE_PER_IP', '6'))  # per minute
+COMMENT_BURST_PER_IP = int(os.environ.get('COMMENT_BURST_PER_IP', '10'))
+COMMENT_RATE_PER_POST = int(os.environ.get('COMMENT_RATE_PER_POST', '60'))  # per minute
+COMMENT_BURST_PER_POST = int(os.environ.get('COMMENT_BURST_PER_POST', '60'))
+COMMENT_RETRY_BASE_SECONDS = 0.5
+COMMENT_RETRY_MAX_SECONDS = 30
+COMMENT_DRAIN_TIMEOUT_SECONDS = int(os.environ.get('COMMENT_DRAIN_TIMEOUT_SECONDS', '30'))
+KNOWN_POSTS_SIZE = 10000
+# Reverse proxies in front of the app, each appending one X-Forwarded-For hop. The default of 1 matches
+# the deployment, where the ingress serving /api is the only proxy; with 0 behind a proxy every client
+# shares the proxy's address and so one rate-limit bucket. Set 0 when uvicorn is exposed directly,
+# otherwise clients can pick their own bucket key via the header (the per-post limit still applies)
+TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT', '1'))
+
+class TokenBucketLimiter:
+    """Token bucket per key; the least recently seen buckets are evicted past max_keys."""
+
+    def __init__(self, rate_per_minute: int, burst: int, max_keys: int = 10000):
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+        self.allowed = 0
+        self.rejected = 0
+
+    def acquire(self, key: str) -> float:
+        """Take a token for key; returns 0 when allowed, else seconds until a token frees up."""
+        now = time.monotonic()
+        tokens, updated = self.buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+            self.allowed += 1
+        else:
+            wait = (1 - tokens) / self.rate
+            self.rejected += 1
+        self.buckets[key] = (tokens, now)
+        while len(self.buckets) > self.max_keys:
+            self.buckets.popitem(last=False)
+        return wait
+
+    def stats(self) -> dict:
+        return {"keys": len(self.buckets), "allowed": self.allowed, "rejected": self.rejected}
+
+ip_comment_limiter = TokenBucketLimiter(COMMENT_RATE_PER_IP, COMMENT_BURST_PER_IP)
+post_comment_limiter = TokenBucketLimiter(COMMENT_RATE_PER_POST, COMMENT_BURST_PER_POST)
+
+def client_ip(request: Request) -> str:
+    # Only hops appended by our own proxies are trusted; anything left of them is client-supplied
+    if TRUSTED_PROXY_COUNT > 0:
+        hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+        if len(hops) >= TRUSTED_PROXY_COUNT:
+            return hops[-TRUSTED_PROXY_COUNT]
+    return request.client.host if request.client else "unknown"
+
+_known_posts = OrderedDict()
+
+async def post_exists(post_id: str) -> bool:
+    if post_id in _known_posts:
+        _known_posts.move_to_end(post_id)
+        return True
+    if not await db.posts.find_one({"post_id": post_id}, {"_id": 1}):
+        return False
+    _known_posts[post_id] = True
+    while len(_known_posts) > KNOWN_POSTS_SIZE:
+        _known_posts.popitem(last=False)
+    return True
+
+def is_transient(error: Exception) -> bool:
+    """Errors worth waiting out: the deployment is unreachable or did not acknowledge the write."""
+    if isinstance(error, BulkWriteError):
+        # Per-document write errors fail the same way on every attempt; only write concern errors pass
+        details = error.details
+        return bool(details.get("writeConcernErrors")) and all(e["code"] == 11000 for e in details["writeErrors"])
+    return isinstance(error, (ConnectionFailure, WriteConcernError))
+
+async def store_comments(batch: List[dict]):
+    """Insert a batch; returns (stored comments, {post_id: published}). Safe to retry."""
+    post_ids = list(dict.fromkeys(comment["post_id"] for comment in batch))
+    # Posts deleted while their comments sat in the queue take those comments with them
+    existing = {
+        post["post_id"]: post.get("published", True)
+        async for post in db.posts.find({"post_id": {"$in": post_ids}}, {"_id": 0, "post_id": 1, "published": 1})
+    }
+    comments = [comment for comment in batch if comment["post_id"] in existing]
+    if not comments:
+        return [], existing
+    
+    try:
+        await db.comments.insert_many(comments, ordered=False)
+    except BulkWriteError as e:
+        # comment_ids are ours, so a duplicate key means an earlier attempt already wrote that comment
+        details = e.details
+        if details.get("writeConcernErrors") or any(error["code"] != 11000 for error in details["writeErrors"]):
+            raise
+    return comments, existing
+
+async def count_comments(comments: List[dict]):
+    added = Counter(comment["post_id"] for comment in comments)
+    latest = {comment["post_id"]: comment["created_at"] for comment in comments}
+    await db.posts.bulk_write([
+        UpdateOne({"post_id": post_id}, {"$inc": {"comment_count": count}, "$set": {"comments_updated_at": latest[post_id]}})
+        for post_id, count in added.items()
+    ], ordered=False)
+
+async def announce_comments(comments: List[dict], published: dict):
+    await response_cache.invalidate("posts", *[f"post:{post_id}" for post_id in dict.fromkeys(c["post_id"] for c in comments)])
+    for comment in comments:
+        # Nothing about unpublished posts goes out on the public event stream
+        if published[comment["post_id"]]:
+            event_bus.publish(f"post:{comment['post_id']}", "comment.created", comment, CommentResponse)
+
+async def flush_comments(batch: List[dict]) -> int:
+    """Insert a batch in arrival order and apply its count, cache and event side effects."""
+    comments, published = await store_comments(batch)
+    if comments:
+        await count_comments(comments)
+        await announce_comments(comments, published)
+    return len(comments)
+
+class CommentQueue:
+    """Bounded FIFO of accepted comments, flushed when a batch fills or the flush interval passes."""
+
+    def __init__(self, max_size: int, batch_size: int, flush_ms: int):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000
+        self.queue = None
+        self.flusher = None
+        self.closing = False
+        self.enqueued = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.retries = 0
+        self.rejected = 0
+        self.batches = 0
+        self.current_batch = []
+
+    def _ensure_started(self):
+        if self.flusher is None:
+            self.queue = asyncio.Queue(maxsize=self.max_size)
+            self.flusher = asyncio.create_task(self._run())
+
+    def put(self, comment: dict):
+        if self.closing:
+            raise HTTPException(status_code=503, detail="Comments are temporarily unavailable")
+        self._ensure_started()
+        try:
+            self.queue.put_nowait(comment)
+        except asyncio.QueueFull:
+            raise HTTPException(status_code=503, detail="Too many pending comments, retry shortly",
+                                headers={"Retry-After": "1"})
+        self.enqueued += 1
+
+    async def _next_batch(self) -> List[dict]:
+        batch = [await self.queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            # Draining on shutdown: flush what we have instead of waiting out the interval
+            remaining = 0 if self.closing else deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _retry(self, step, *args):
+        delay = COMMENT_RETRY_BASE_SECONDS
+        while True:
+            try:
+                return await step(*args)
+            except Exception as e:
+                if not is_transient(e):
+                    raise
+                self.retries += 1
+                logger.warning(f"Comment flush step {step.__name__} failed, retrying in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, COMMENT_RETRY_MAX_SECONDS)
+
+    async def _store(self, batch: List[dict]):
+        """store_comments, bisecting a batch that fails on its contents until the bad comments are isolated."""
+        try:
+            return await self._retry(store_comments, batch)
+        except Exception as e:
+            if len(batch) == 1:
+                # Retrying cannot help (e.g. DocumentTooLarge), and blocking here would stall every comment behind it
+                comment = batch[0]
+                self.rejected += 1
+                logger.error(f"Rejected comment {comment['comment_id']} on {comment['post_id']} "
+                             f"({len(comment.get('content') or '')} chars): {e!r}")
+                return [], {}
+            middle = len(batch) // 2
+            first, first_published = await self._store(batch[:middle])
+            second, second_published = await self._store(batch[middle:])
+            return first + second, {**first_published, **second_published}
+
+    async def _run(self):
+        while True:
+            batch = self.current_batch = await self._next_batch()
+            rejected = self.rejected
+            try:
+                # These comments were already acknowledged with 200, so transient failures retry until the
+                # writes land; each step is retried on its own so a failed count update never re-inserts
+                comments, published = await self._store(batch)
+                if comments:
+                    try:
+                        await self._retry(count_comments, comments)
+                    except Exception as e:
+                        logger.error(f"Comment count update failed, run /admin/reconcile/comment-counts: {e!r}")
+                    try:
+                        await announce_comments(comments, published)
+                    except Exception as e:
+                        logger.warning(f"Comment cache invalidation/events failed: {e}")
+                self.flushed += len(comments)
+                self.dropped += len(batch) - len(comments) - (self.rejected - rejected)
+                self.batches += 1
+            finally:
+                self.current_batch = []
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def drain(self):
+        """Stop accepting comments and wait until everything queued has been written."""
+        self.closing = True
+        if self.flusher is None:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), COMMENT_DRAIN_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            # Database still unreachable: log what was acknowledged but never written so it can be replayed
+            unwritten = list(self.current_batch)
+            while not self.queue.empty():
+                unwritten.append(self.queue.get_nowait())
+            logger.error(f"Comment queue drain timed out with {len(unwritten)} unwritten comments")
+            for comment in unwritten:
+                logger.error(f"Unwritten comment: {json.dumps(comment, default=str)}")
+        self.flusher.cancel()
+        self.flusher = None
+
+    def stats(self) -> dict:
+        return {
+            "write_behind": COMMENT_WRITE_BEHIND,
+            "pending": self.queue.qsize() if self.queue else 0,
+            "enqueued": self.enqueued,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "rate_limit": {"ip": ip_comment_limiter.stats(), "post": post_comment_limiter.stats()}
+        }
+
+comment_queue = CommentQueue(COMMENT_QUEUE_SIZE, COMMENT_BATCH_SIZE, COMMENT_FLUSH_MS)
 
 # ============== HELPERS ==============
 
+# bcrypt, jwt, markdown, bleach and httpx are imported where they are used so a cold start only
+# pays for the ones its first requests need
+
 def hash_password(password: str) -> str:
+    import bcrypt
     return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
 
 def verify_password(password: str, hashed: str) -> bool:
+    import bcrypt
     return bcrypt.checkpw(password.encode(), hashed.encode())
 
 def create_jwt_token(user_id: str) -> str:
@@ -118,24 +1122,392 @@ def create_jwt_token(user_id: str) -> str:
         "user_id": user_id,
         "exp": datetime.now(timezone.utc) + timedelta(hours=JWT_EXPIRATION_HOURS)
     }
+    import jwt
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
-def decode_jwt_token(token: str) -> dict:
+def decode_jwt_token(token: str) -> Optional[dict]:
+    """Decode one of our JWTs; returns None for tokens we did not sign, raises ExpiredSignatureError."""
+    import jwt
     try:
         return jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
     except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
+        raise
     except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+        return None
 
-def render_markdown(content: str) -> str:
-    html = markdown.markdown(content, extensions=['fenced_code', 'tables', 'nl2br'])
-    allowed_tags = ['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'strong', 'em', 'ul', 'ol', 'li', 
-                   'code', 'pre', 'blockquote', 'a', 'table', 'thead', 'tbody', 'tr', 'th', 'td', 'br', 'hr']
-    allowed_attrs = {'a': ['href', 'title'], 'code': ['class'], 'pre': ['class']}
-    return bleach.clean(html, tags=allowed_tags, attributes=allowed_attrs)
+MARKDOWN_EXTENSIONS = ['fenced_code', 'tables', 'nl2br']
+ALLOWED_TAGS = ['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'strong', 'em', 'ul', 'ol', 'li', 
+                'code', 'pre', 'blockquote', 'a', 'table', 'thead', 'tbody', 'tr', 'th', 'td', 'br', 'hr']
+ALLOWED_ATTRS = {'a': ['href', 'title'], 'code': ['class'], 'pre': ['class']}
 
-async def get_current_user(request: Request) -> Optional[dict]:
+# Changes whenever the renderer configuration changes, marking stored HTML as stale
+RENDERER_VERSION = hashlib.sha256(
+    json.dumps([MARKDOWN_EXTENSIONS, ALLOWED_TAGS, ALLOWED_ATTRS], sort_keys=True).encode()
+).hexdigest()[:12]
+
+RENDER_CACHE_SIZE = int(os.environ.get('RENDER_CACHE_SIZE', '512'))
+
+class RenderCache:
+    """LRU of sanitized HTML keyed by content hash."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        html = self.entries.get(key)
+        if html is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return html
+
+    def put(self, key: str, html: str):
+        self.entries[key] = html
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "renderer_version": RENDERER_VERSION
+        }
+
+render_cache = RenderCache(RENDER_CACHE_SIZE)
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode()).hexdigest()
+
+def is_jwt_shaped(token: str) -> bool:
+    # Our JWTs are three dot-separated segments; OAuth session tokens are opaque strings
+    return token.count(".") == 2
+
+def render_html(content: str) -> str:
+    import bleach
+    import markdown
+    html = markdown.markdown(content, extensions=MARKDOWN_EXTENSIONS)
+    return bleach.clean(html, tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRS)
+
+async def render_markdown(content: str) -> str:
+    key = content_hash(content)
+    html = render_cache.get(key)
+    if html is None:
+        html = await render_pool.run(render_html, content)
+        render_cache.put(key, html)
+    return html
+
+async def rendered_fields(content: str) -> dict:
+    """content_html plus the stamps used to detect stale renders."""
+    return {
+        "content_html": await render_markdown(content),
+        "content_hash": content_hash(content),
+        "renderer_version": RENDERER_VERSION
+    }
+
+def search_terms(title: str, tags: List[str]) -> List[str]:
+    """Lowercased title words and tags, stored on the post so prefix search can use an index."""
+    return sorted(set(title.lower().split()) | {tag.lower() for tag in tags})
+
+def prefix_search_filter(search: str) -> dict:
+    # Every term must prefix-match a title word or tag. The terms are stored lowercased, so the
+    # anchored, case-sensitive regex becomes an index range scan; input is escaped, never a pattern
+    clauses = [{"search_terms": {"$regex": f"^{re.escape(term)}"}} for term in search.lower().split()]
+    return {"$and": clauses} if clauses else {}
+
+async def resolve_search_filter(base_query: dict, search: str) -> dict:
+    """Use the weighted text index, falling back to prefix matching when it finds nothing."""
+    text_filter = {"$text": {"$search": search}}
+    if await db.posts.find_one({**base_query, **text_filter}, {"_id": 1}):
+        return text_filter
+    return prefix_search_filter(search)
+
+async def build_posts_query(
+    request: Optional[Request],
+    tag: Optional[str] = None,
+    search: Optional[str] = None,
+    include_unpublished: bool = False
+) -> dict:
+    """Filter shared by every posts listing route so lists and totals always agree."""
+    query = {}
+    
+    # Only show published posts unless admin is viewing
+    if not include_unpublished:
+        query["published"] = True
+    else:
+        user = await get_current_user(request)
+        if not user or not user.get("is_admin", False):
+            query["published"] = True
+    
+    if tag:
+        query["tags"] = tag
+    
+    if search:
+        query.update(await resolve_search_filter(query, search))
+    
+    return query
+
+# Listing totals keyed by the serialized filter: {key: (expires_at, count)}
+TOTAL_CACHE_TTL_SECONDS = 60
+_total_cache = {}
+
+def get_cached_total(key: str) -> Optional[int]:
+    entry = _total_cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+def set_cached_total(key: str, count: int):
+    if len(_total_cache) > 1000:
+        _total_cache.clear()
+    _total_cache[key] = (time.monotonic() + TOTAL_CACHE_TTL_SECONDS, count)
+
+SUMMARY_FIELDS = ["post_id", "title", "preview", "tags", "author_id", "author_name", "published",
+                  "created_at", "updated_at", "comment_count"]
+OPTIONAL_LIST_FIELDS = {"content", "content_html"}
+# Read by the HTTP validators but not returned
+VALIDATOR_FIELDS = ["comments_updated_at", "renderer_version"]
+
+def summary_projection(fields: Optional[str]) -> dict:
+    """Projection for list endpoints; fields= opts into the heavy body fields."""
+    extra = {f.strip() for f in fields.split(",") if f.strip()} if fields else set()
+    unknown = extra - OPTIONAL_LIST_FIELDS
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return {"_id": 0, **{f: 1 for f in SUMMARY_FIELDS + VALIDATOR_FIELDS + sorted(extra)}}
+
+@asynccontextmanager
+async def write_session():
+    """Yield a session with an open transaction when enabled, else None (plain writes)."""
+    if not MONGO_TRANSACTIONS:
+        yield None
+        return
+    async with await get_client().start_session() as session:
+        async with session.start_transaction():
+            yield session
+
+# The tags collection is a materialized view over *published* posts:
+# {name, count, last_used_at, latest_posts: [{post_id, title, created_at}]}
+TAG_LATEST_POSTS = 5
+
+def visible_tags(post: dict) -> list:
+    """Tags a post contributes to the view: none while it is a draft."""
+    return list(dict.fromkeys(post.get("tags", []))) if post.get("published", True) else []
+
+def tag_post_ref(post: dict) -> dict:
+    return {"post_id": post["post_id"], "title": post["title"], "created_at": post["created_at"]}
+
+def tag_stats_operations(post: dict, added=(), removed=()) -> list:
+    """One bulk_write batch for a tag delta; ordered so the sweep runs after the decrements."""
+    operations = [
+        UpdateOne(
+            {"name": tag},
+            {
+                "$inc": {"count": 1},
+                "$max": {"last_used_at": post["created_at"]},
+                "$push": {"latest_posts": {
+                    "$each": [tag_post_ref(post)],
+                    "$sort": {"created_at": -1},
+                    "$slice": TAG_LATEST_POSTS
+                }}
+            },
+            upsert=True
+        )
+        for tag in dict.fromkeys(added)
+    ]
+    operations += [
+        UpdateOne({"name": tag}, {"$inc": {"count": -1}, "$pull": {"latest_posts": {"post_id": post["post_id"]}}})
+        for tag in dict.fromkeys(removed)
+    ]
+    if removed:
+        operations.append(DeleteMany({"name": {"$in": list(removed)}, "count": {"$lte": 0}}))
+    return operations
+
+async def refill_tag_stats(names, session=None):
+    # After a removal the newest-posts list may be short and last_used_at stale; reload both for those tags only
+    operations = []
+    for name in dict.fromkeys(names):
+        latest = await db.posts.find(
+            {"tags": name, "published": True},
+            {"_id": 0, "post_id": 1, "title": 1, "created_at": 1},
+            session=session
+        ).sort("created_at", DESCENDING).limit(TAG_LATEST_POSTS).to_list(TAG_LATEST_POSTS)
+        if latest:
+            operations.append(UpdateOne(
+                {"name": name},
+                {"$set": {"latest_posts": latest, "last_used_at": latest[0]["created_at"]}}
+            ))
+    if operations:
+        await db.tags.bulk_write(operations, ordered=False, session=session)
+
+async def apply_tag_delta(post: dict, added=(), removed=(), session=None):
+    operations = tag_stats_operations(post, added, removed)
+    if operations:
+        await db.tags.bulk_write(operations, ordered=True, session=session)
+    if removed:
+        await refill_tag_stats(removed, session=session)
+
+async def apply_bulk_tag_delta(added: Counter, removed: Counter, session=None):
+    """Net tag delta for many posts at once: one $inc per tag, then a single refill of the view."""
+    net = Counter(added)
+    net.subtract(removed)
+    operations = [
+        UpdateOne({"name": tag}, {"$inc": {"count": delta}}, upsert=delta > 0)
+        for tag, delta in net.items() if delta
+    ]
+    if operations:
+        operations.append(DeleteMany({"name": {"$in": list(net)}, "count": {"$lte": 0}}))
+        await db.tags.bulk_write(operations, ordered=True, session=session)
+    # Newest-post lists and last_used_at can change even when a tag's net count does not
+    await refill_tag_stats(set(added) | set(removed), session=session)
+
+async def retitle_tag_posts(post_id: str, title: str, session=None):
+    await db.tags.update_many(
+        {"latest_posts.post_id": post_id},
+        {"$set": {"latest_posts.$.title": title}},
+        session=session
+    )
+
+async def reconcile_tags(apply: bool = True) -> dict:
+    """Rebuild the tag view from published posts and report how far it had drifted."""
+    pipeline = [
+        {"$match": {"published": True}},
+        {"$unwind": "$tags"},
+        {"$group": {
+            "_id": "$tags",
+            "count": {"$sum": 1},
+            "last_used_at": {"$max": "$created_at"},
+            # Bounded per group (MongoDB 5.2+), so a popular tag never accumulates its whole post list
+            "latest_posts": {"$topN": {
+                "n": TAG_LATEST_POSTS,
+                "sortBy": {"created_at": -1, "post_id": -1},
+                "output": {"post_id": "$post_id", "title": "$title", "created_at": "$created_at"}
+            }}
+        }}
+    ]
+    actual = {}
+    async for row in db.posts.aggregate(pipeline):
+        actual[row["_id"]] = {
+            "count": row["count"],
+            "last_used_at": row["last_used_at"],
+            "latest_posts": row["latest_posts"]
+        }
+    stored = {tag["name"]: tag.get("count", 0) async for tag in db.tags.find({}, {"_id": 0, "name": 1, "count": 1})}
+    
+    drift = []
+    for name in sorted(set(actual) | set(stored)):
+        expected = actual.get(name, {}).get("count", 0)
+        if stored.get(name) != expected:
+            drift.append({"name": name, "stored": stored.get(name), "actual": expected})
+    
+    if apply:
+        # Rewrite every tag so last_used_at and latest_posts are rebuilt too, not only drifted counts
+        operations = [UpdateOne({"name": name}, {"$set": stats}, upsert=True) for name, stats in actual.items()]
+        operations.append(DeleteMany({"name": {"$nin": list(actual)}}))
+        await db.tags.bulk_write(operations, ordered=False)
+        await response_cache.invalidate("tags")
+    
+    if drift:
+        logger.info(f"Tag reconcile found {len(drift)} drifted tags (applied={apply})")
+    return {"drifted": len(drift), "applied": apply, "tags": drift}
+
+def to_millis(value: Optional[datetime]) -> Optional[datetime]:
+    # BSON dates hold milliseconds; anything finer is dropped on the way into Mongo
+    return value.replace(microsecond=value.microsecond // 1000 * 1000) if value else value
+
+def encode_cursor(created_at: datetime, doc_id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), doc_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, doc_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), doc_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_filter(created_at, doc_id: str, id_field: str = "post_id") -> dict:
+    # Strictly after (created_at, id) in (created_at desc, id desc) order
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, id_field: {"$lt": doc_id}}
+    ]}
+
+# Resolved users keyed by token, so authenticated requests skip the users/user_sessions lookups
+AUTH_CACHE_TTL_SECONDS = int(os.environ.get('AUTH_CACHE_TTL_SECONDS', '60'))
+AUTH_CACHE_SIZE = int(os.environ.get('AUTH_CACHE_SIZE', '10000'))
+
+class AuthCache:
+    """TTL + LRU cache of token -> user, indexed by user_id for invalidation."""
+
+    def __init__(self, ttl_seconds: int, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.tokens_by_user = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[dict]:
+        entry = self.entries.get(token)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                self.invalidate_token(token)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(token)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, token: str, user: dict, expires_at: Optional[datetime] = None):
+        ttl = self.ttl_seconds
+        if expires_at is not None:
+            # Never serve a token past its own expiry
+            ttl = min(ttl, (expires_at - datetime.now(timezone.utc)).total_seconds())
+        if ttl <= 0:
+            return
+        self.entries[token] = (time.monotonic() + ttl, user)
+        self.entries.move_to_end(token)
+        self.tokens_by_user.setdefault(user["user_id"], set()).add(token)
+        while len(self.entries) > self.max_size:
+            self.invalidate_token(next(iter(self.entries)))
+
+    def invalidate_token(self, token: str):
+        entry = self.entries.pop(token, None)
+        if entry is not None:
+            user_id = entry[1]["user_id"]
+            tokens = self.tokens_by_user.get(user_id)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self.tokens_by_user[user_id]
+
+    def invalidate_user(self, user_id: str):
+        """Drop every cached token for a user, e.g. after a profile or admin flag change."""
+        for token in self.tokens_by_user.pop(user_id, set()):
+            self.entries.pop(token, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+auth_cache = AuthCache(AUTH_CACHE_TTL_SECONDS, AUTH_CACHE_SIZE)
+
+def get_request_token(request: Request) -> Optional[str]:
     # Check cookie first
     session_token = request.cookies.get("session_token")
     
@@ -145,18 +1517,31 @@ async def get_current_user(request: Request) -> Optional[dict]:
         if auth_header and auth_header.startswith("Bearer "):
             session_token = auth_header.split(" ")[1]
     
+    return session_token
+
+async def get_current_user(request: Request) -> Optional[dict]:
+    session_token = get_request_token(request)
     if not session_token:
         return None
     
-    # Check if it's a JWT token (for email/password auth)
-    try:
-        payload = decode_jwt_token(session_token)
-        user = await db.users.find_one({"user_id": payload["user_id"]}, {"_id": 0})
+    user = auth_cache.get(session_token)
+    if user is not None:
         return user
-    except:
-        pass
     
-    # Check if it's a session token (for Google OAuth)
+    # JWT (email/password auth): route by shape so opaque session tokens never pay for a failed decode
+    if is_jwt_shaped(session_token):
+        import jwt
+        try:
+            payload = decode_jwt_token(session_token)
+        except jwt.ExpiredSignatureError:
+            return None
+        if payload is not None:
+            user = await db.users.find_one({"user_id": payload["user_id"]}, {"_id": 0})
+            if user:
+                auth_cache.put(session_token, user, datetime.fromtimestamp(payload["exp"], timezone.utc))
+            return user
+    
+    # Session token (for Google OAuth)
     session = await db.user_sessions.find_one({"session_token": session_token}, {"_id": 0})
     if not session:
         return None
@@ -164,13 +1549,21 @@ async def get_current_user(request: Request) -> Optional[dict]:
     # Check expiry
     expires_at = session.get("expires_at")
     if isinstance(expires_at, str):
-        expires_at = datetime.fromisoformat(expires_at)
+        # Sessions written before timestamps were stored as BSON dates
+        try:
+            expires_at = datetime.fromisoformat(expires_at)
+        except ValueError:
+            return None
+    if not isinstance(expires_at, datetime):
+        return None
     if expires_at.tzinfo is None:
         expires_at = expires_at.replace(tzinfo=timezone.utc)
     if expires_at < datetime.now(timezone.utc):
         return None
     
     user = await db.users.find_one({"user_id": session["user_id"]}, {"_id": 0})
+    if user:
+        auth_cache.put(session_token, user, expires_at)
     return user
 
 async def require_auth(request: Request) -> dict:
@@ -202,9 +1595,9 @@ async def register(data: UserCreate, response: Response):
         "user_id": user_id,
         "email": data.email,
         "name": data.name,
-        "password_hash": hash_password(data.password),
+        "password_hash": await auth_pool.run(hash_password, data.password),
         "is_admin": is_first_user,  # First user is admin
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     }
     await db.users.insert_one(user_doc)
     
@@ -226,7 +1619,7 @@ async def register(data: UserCreate, response: Response):
 @api_router.post("/auth/login", response_model=dict)
 async def login(data: UserLogin, response: Response):
     user = await db.users.find_one({"email": data.email}, {"_id": 0})
-    if not user or not verify_password(data.password, user.get("password_hash", "")):
+    if not user or not await auth_pool.run(verify_password, data.password, user.get("password_hash", "")):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     token = create_jwt_token(user["user_id"])
@@ -258,8 +1651,9 @@ async def get_me(request: Request):
 
 @api_router.post("/auth/logout")
 async def logout(request: Request, response: Response):
-    session_token = request.cookies.get("session_token")
+    session_token = get_request_token(request)
     if session_token:
+        auth_cache.invalidate_token(session_token)
         await db.user_sessions.delete_one({"session_token": session_token})
     
     response.delete_cookie(key="session_token", path="/", samesite="none", secure=True)
@@ -275,6 +1669,7 @@ async def exchange_session(request: Request, response: Response):
         raise HTTPException(status_code=400, detail="Session ID required")
     
     # Exchange session_id with Emergent Auth
+    import httpx
     async with httpx.AsyncClient() as client:
         try:
             resp = await client.get(
@@ -300,7 +1695,7 @@ async def exchange_session(request: Request, response: Response):
             "name": auth_data["name"],
             "picture": auth_data.get("picture"),
             "is_admin": user_count == 0,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
         await db.users.insert_one(user)
     else:
@@ -310,6 +1705,7 @@ async def exchange_session(request: Request, response: Response):
             {"user_id": user_id},
             {"$set": {"name": auth_data["name"], "picture": auth_data.get("picture")}}
         )
+        auth_cache.invalidate_user(user_id)
     
     # Create session
     session_token = auth_data.get("session_token", f"session_{uuid.uuid4().hex}")
@@ -318,8 +1714,8 @@ async def exchange_session(request: Request, response: Response):
     await db.user_sessions.insert_one({
         "user_id": user_id,
         "session_token": session_token,
-        "expires_at": expires_at.isoformat(),
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "expires_at": expires_at,  # BSON date so the TTL index can expire it
+        "created_at": datetime.now(timezone.utc)
     })
     
     response.set_cookie(
@@ -342,90 +1738,144 @@ async def exchange_session(request: Request, response: Response):
 
 # ============== POST ROUTES ==============
 
-@api_router.get("/posts", response_model=List[PostResponse])
+@api_router.get("/posts", response_model=List[PostSummary], response_model_exclude_none=True)
 async def get_posts(
     page: int = 1,
     limit: int = 10,
     tag: Optional[str] = None,
     search: Optional[str] = None,
     include_unpublished: bool = False,
-    request: Request = None
+    cursor: bool = False,
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    request: Request = None,
+    response: Response = None
 ):
-    query = {}
+    query = await build_posts_query(request, tag, search, include_unpublished)
     
-    # Only show published posts unless admin is viewing
-    if not include_unpublished:
-        query["published"] = True
+    # Cursor mode pages by (created_at, post_id) instead of skip, so deep pages cost the same as page 1
+    keyset_mode = cursor or after is not None
+    
+    projection = summary_projection(fields)
+    sort = [("created_at", DESCENDING), ("post_id", DESCENDING)]
+    if search:
+        # Relevance order has no stable key to resume from, so cursor mode keeps date order
+        if "$text" in query and not keyset_mode:
+            projection["score"] = {"$meta": "textScore"}
+            sort = [("score", {"$meta": "textScore"})] + sort
+    
+    if keyset_mode:
+        if after:
+            query.update(keyset_filter(*decode_cursor(after)))
+        posts = await listing_posts(query).find(query, projection).sort(sort).limit(limit).to_list(limit)
+        if len(posts) == limit:
+            last = posts[-1]
+            response.headers["X-Next-Cursor"] = encode_cursor(last["created_at"], last["post_id"])
     else:
-        user = await get_current_user(request)
-        if not user or not user.get("is_admin", False):
-            query["published"] = True
+        skip = (page - 1) * limit
+        posts = await listing_posts(query).find(query, projection).sort(sort).skip(skip).limit(limit).to_list(limit)
     
-    if tag:
-        query["tags"] = tag
+    cache_control = CACHE_POLICIES["posts"] if query.get("published") is True else CACHE_POLICIES["private"]
+    not_modified = conditional_response(
+        request,
+        response,
+        make_etag([post_validator_parts(post) for post in posts]),
+        cache_control,
+        latest_modified(*[post.get("updated_at") for post in posts], *[post.get("comments_updated_at") for post in posts])
+    )
+    if not_modified:
+        return not_modified
     
-    if search:
-        query["$or"] = [
-            {"title": {"$regex": search, "$options": "i"}},
-            {"content": {"$regex": search, "$options": "i"}},
-            {"tags": {"$regex": search, "$options": "i"}}
-        ]
-    
-    skip = (page - 1) * limit
-    posts = await db.posts.find(query, {"_id": 0}).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
-    
-    # Add comment counts
-    for post in posts:
-        comment_count = await db.comments.count_documents({"post_id": post["post_id"]})
-        post["comment_count"] = comment_count
-        if isinstance(post.get("created_at"), str):
-            post["created_at"] = datetime.fromisoformat(post["created_at"])
-        if isinstance(post.get("updated_at"), str):
-            post["updated_at"] = datetime.fromisoformat(post["updated_at"])
-    
-    return posts
+    return model_response(List[PostSummary], posts, response, exclude_none=True)
 
 @api_router.get("/posts/count")
 async def get_posts_count(tag: Optional[str] = None, search: Optional[str] = None):
-    query = {"published": True}
-    if tag:
-        query["tags"] = tag
-    if search:
-        query["$or"] = [
-            {"title": {"$regex": search, "$options": "i"}},
-            {"content": {"$regex": search, "$options": "i"}}
-        ]
-    count = await db.posts.count_documents(query)
+    query = await build_posts_query(None, tag, search)
+    count = await listing_posts(query).count_documents(query)
     return {"count": count}
 
-@api_router.get("/posts/{post_id}", response_model=PostResponse)
-async def get_post(post_id: str, request: Request = None):
-    post = await db.posts.find_one({"post_id": post_id}, {"_id": 0})
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
+@api_router.get("/posts/listing", response_model=PostListResponse, response_model_exclude_none=True)
+async def get_posts_listing(
+    page: int = 1,
+    limit: int = 10,
+    tag: Optional[str] = None,
+    search: Optional[str] = None,
+    include_unpublished: bool = False,
+    approximate_total: bool = False,
+    fields: Optional[str] = None,
+    request: Request = None,
+    response: Response = None
+):
+    """One page of posts plus the total, computed by a single $facet aggregation."""
+    page = max(page, 1)
+    limit = max(limit, 1)
+    projection = summary_projection(fields)
+    query = await build_posts_query(request, tag, search, include_unpublished)
     
-    # Check if unpublished post - only admins can view
-    if not post.get("published", True):
-        user = await get_current_user(request)
-        if not user or not user.get("is_admin", False):
-            raise HTTPException(status_code=404, detail="Post not found")
+    sort = {"created_at": -1, "post_id": -1}
+    if "$text" in query:
+        sort = {"score": {"$meta": "textScore"}, **sort}
+    
+    cache_key = json.dumps(query, sort_keys=True, default=str)
+    cached_total = get_cached_total(cache_key) if approximate_total else None
     
-    comment_count = await db.comments.count_documents({"post_id": post_id})
-    post["comment_count"] = comment_count
+    facets = {"items": [{"$skip": (page - 1) * limit}, {"$limit": limit}, {"$project": projection}]}
+    if cached_total is None:
+        facets["total"] = [{"$count": "count"}]
     
-    if isinstance(post.get("created_at"), str):
-        post["created_at"] = datetime.fromisoformat(post["created_at"])
-    if isinstance(post.get("updated_at"), str):
-        post["updated_at"] = datetime.fromisoformat(post["updated_at"])
+    pipeline = [{"$match": query}, {"$sort": sort}, {"$facet": facets}]
+    result = (await listing_posts(query).aggregate(pipeline).to_list(1))[0]
     
+    if cached_total is None:
+        total = result["total"][0]["count"] if result["total"] else 0
+        set_cached_total(cache_key, total)
+    else:
+        total = cached_total
+    
+    listing = {
+        "items": result["items"],
+        "total": total,
+        "page": page,
+        "limit": limit,
+        "pages": (total + limit - 1) // limit,
+        "total_is_approximate": cached_total is not None
+    }
+    return model_response(PostListResponse, listing, response, exclude_none=True)
+
+async def find_readable_post(post_id: str, request: Request, projection: Optional[dict] = None) -> dict:
+    """Fetch a post the caller may read; unpublished posts are 404 unless the caller is an admin."""
+    post = await db.posts.find_one({"post_id": post_id}, projection or {"_id": 0})
+    if post and not post.get("published", True):
+        user = await get_current_user(request)
+        if not user or not user.get("is_admin", False):
+            post = None
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
     return post
 
+@api_router.get("/posts/{post_id}", response_model=PostResponse)
+async def get_post(post_id: str, request: Request = None, response: Response = None):
+    post = await find_readable_post(post_id, request)
+    
+    not_modified = conditional_response(
+        request,
+        response,
+        make_etag(post_validator_parts(post)),
+        CACHE_POLICIES["post"] if post.get("published", True) else CACHE_POLICIES["private"],
+        latest_modified(post.get("updated_at"), post.get("comments_updated_at"))
+    )
+    if not_modified:
+        return not_modified
+    
+    return model_response(PostResponse, post, response)
+
 @api_router.post("/posts", response_model=PostResponse)
 async def create_post(data: PostCreate, request: Request):
     user = await require_admin(request)
     
     post_id = f"post_{uuid.uuid4().hex[:12]}"
-    now = datetime.now(timezone.utc).isoformat()
+    # Millisecond precision so the returned updated_at matches what is stored (expected_updated_at)
+    now = to_millis(datetime.now(timezone.utc))
     
     preview = data.preview or data.content[:200] + "..." if len(data.content) > 200 else data.content
     
@@ -433,74 +1883,102 @@ async def create_post(data: PostCreate, request: Request):
         "post_id": post_id,
         "title": data.title,
         "content": data.content,
-        "content_html": render_markdown(data.content),
+        **(await rendered_fields(data.content)),
         "preview": preview,
         "tags": data.tags,
+        "search_terms": search_terms(data.title, data.tags),
         "author_id": user["user_id"],
         "author_name": user["name"],
         "published": data.published,
+        "comment_count": 0,
         "created_at": now,
         "updated_at": now
     }
     
-    await db.posts.insert_one(post)
-    
-    # Update tags collection
-    for tag in data.tags:
-        await db.tags.update_one(
-            {"name": tag},
-            {"$inc": {"count": 1}},
-            upsert=True
-        )
+    async with write_session() as session:
+        await db.posts.insert_one(post, session=session)
+        await apply_tag_delta(post, added=visible_tags(post), session=session)
+    _total_cache.clear()
+    await response_cache.invalidate("posts", "tags")
     
-    post["comment_count"] = 0
-    post["created_at"] = datetime.fromisoformat(now)
-    post["updated_at"] = datetime.fromisoformat(now)
     return post
 
+UPDATE_POST_ATTEMPTS = 3
+# Just what update_post needs to diff tags and decide on re-rendering
+UPDATE_POST_PROJECTION = {"_id": 0, "post_id": 1, "title": 1, "tags": 1, "published": 1,
+                          "created_at": 1, "updated_at": 1, "content_hash": 1, "renderer_version": 1}
+
+def same_instant(a: Optional[datetime], b: Optional[datetime]) -> bool:
+    return to_millis(latest_modified(a)) == to_millis(latest_modified(b))
+
 @api_router.put("/posts/{post_id}", response_model=PostResponse)
 async def update_post(post_id: str, data: PostUpdate, request: Request):
     await require_admin(request)
     
-    post = await db.posts.find_one({"post_id": post_id}, {"_id": 0})
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
-    
-    update_data = {"updated_at": datetime.now(timezone.utc).isoformat()}
-    
-    if data.title is not None:
-        update_data["title"] = data.title
-    if data.content is not None:
-        update_data["content"] = data.content
-        update_data["content_html"] = render_markdown(data.content)
-        if data.preview is None:
-            update_data["preview"] = data.content[:200] + "..." if len(data.content) > 200 else data.content
-    if data.preview is not None:
-        update_data["preview"] = data.preview
-    if data.tags is not None:
-        # Update tag counts
-        old_tags = set(post.get("tags", []))
-        new_tags = set(data.tags)
+    # Read-modify-write guarded by updated_at: the write only lands on the exact version we diffed
+    # tags against, so concurrent edits cannot double-count or lose tag deltas
+    for _ in range(UPDATE_POST_ATTEMPTS):
+        current = await db.posts.find_one({"post_id": post_id}, UPDATE_POST_PROJECTION)
+        if not current:
+            raise HTTPException(status_code=404, detail="Post not found")
+        if data.expected_updated_at is not None and not same_instant(current["updated_at"], data.expected_updated_at):
+            raise HTTPException(status_code=409, detail="Post was modified by another request")
         
-        for tag in old_tags - new_tags:
-            await db.tags.update_one({"name": tag}, {"$inc": {"count": -1}})
-        for tag in new_tags - old_tags:
-            await db.tags.update_one({"name": tag}, {"$inc": {"count": 1}}, upsert=True)
+        # Strictly increasing so updated_at doubles as the version stamp
+        now = max(to_millis(datetime.now(timezone.utc)), latest_modified(current["updated_at"]) + timedelta(milliseconds=1))
+        update_data = {"updated_at": now}
         
-        update_data["tags"] = data.tags
-    if data.published is not None:
-        update_data["published"] = data.published
-    
-    await db.posts.update_one({"post_id": post_id}, {"$set": update_data})
-    
-    updated_post = await db.posts.find_one({"post_id": post_id}, {"_id": 0})
-    comment_count = await db.comments.count_documents({"post_id": post_id})
-    updated_post["comment_count"] = comment_count
+        if data.title is not None:
+            update_data["title"] = data.title
+        if data.content is not None:
+            update_data["content"] = data.content
+            stale = current.get("renderer_version") != RENDERER_VERSION
+            if stale or current.get("content_hash") != content_hash(data.content):
+                update_data.update(await rendered_fields(data.content))
+            if data.preview is None:
+                update_data["preview"] = data.content[:200] + "..." if len(data.content) > 200 else data.content
+        if data.preview is not None:
+            update_data["preview"] = data.preview
+        if data.tags is not None:
+            update_data["tags"] = data.tags
+        if data.published is not None:
+            update_data["published"] = data.published
+        if data.title is not None or data.tags is not None:
+            update_data["search_terms"] = search_terms(update_data.get("title", current["title"]),
+                                                       update_data.get("tags", current.get("tags", [])))
+        
+        async with write_session() as session:
+            updated_post = await db.posts.find_one_and_update(
+                {"post_id": post_id, "updated_at": current["updated_at"]},
+                {"$set": update_data},
+                projection={"_id": 0},
+                return_document=ReturnDocument.AFTER,
+                session=session
+            )
+            if updated_post is None:
+                if data.expected_updated_at is not None:
+                    raise HTTPException(status_code=409, detail="Post was modified by another request")
+                continue
+            
+            # Diff what the post contributed to the tag view before and after (tags and publish state)
+            old_tags = visible_tags(current)
+            new_tags = visible_tags(updated_post)
+            added_tags = [tag for tag in new_tags if tag not in old_tags]
+            removed_tags = [tag for tag in old_tags if tag not in new_tags]
+            await apply_tag_delta(updated_post, added=added_tags, removed=removed_tags, session=session)
+            if updated_post["title"] != current["title"]:
+                await retitle_tag_posts(post_id, updated_post["title"], session=session)
+        break
+    else:
+        raise HTTPException(status_code=409, detail="Post is being modified concurrently, retry")
     
-    if isinstance(updated_post.get("created_at"), str):
-        updated_post["created_at"] = datetime.fromisoformat(updated_post["created_at"])
-    if isinstance(updated_post.get("updated_at"), str):
-        updated_post["updated_at"] = datetime.fromisoformat(updated_post["updated_at"])
+    _total_cache.clear()
+    await response_cache.invalidate("posts", f"post:{post_id}", "tags")
+    if updated_post.get("published", True):
+        event_bus.publish(f"post:{post_id}", "post.updated", updated_post, PostSummary)
+    elif current.get("published", True):
+        # Readers of a post that was just unpublished only learn that it went away, never the draft
+        event_bus.publish(f"post:{post_id}", "post.deleted", {"post_id": post_id})
     
     return updated_post
 
@@ -512,51 +1990,195 @@ async def delete_post(post_id: str, request: Request):
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    # Update tag counts
-    for tag in post.get("tags", []):
-        await db.tags.update_one({"name": tag}, {"$inc": {"count": -1}})
+    async with write_session() as session:
+        await db.posts.delete_one({"post_id": post_id}, session=session)
+        await db.comments.delete_many({"post_id": post_id}, session=session)
+        await apply_tag_delta(post, removed=visible_tags(post), session=session)
+    _known_posts.pop(post_id, None)
+    _total_cache.clear()
+    await response_cache.invalidate("posts", f"post:{post_id}", "tags")
+    if post.get("published", True):
+        event_bus.publish(f"post:{post_id}", "post.deleted", {"post_id": post_id})
     
-    await db.posts.delete_one({"post_id": post_id})
-    await db.comments.delete_many({"post_id": post_id})
+    return {"message": "Post deleted"}
+
+BULK_OPERATIONS = {"publish", "unpublish", "delete", "retag"}
+BULK_MAX_POSTS = 1000
+
+async def publish_bulk_events(operation: str, posts: dict, results: dict):
+    """The events update_post/delete_post would send for each changed post that readers could see."""
+    gone, changed = [], []
+    for post_id, post in posts.items():
+        if results[post_id] not in ("updated", "deleted"):
+            continue
+        if operation == "publish" or (operation == "retag" and post.get("published", True)):
+            changed.append(post_id)
+        elif operation in ("unpublish", "delete") and post.get("published", True):
+            gone.append(post_id)
     
-    # Clean up tags with count <= 0
-    await db.tags.delete_many({"count": {"$lte": 0}})
+    for post_id in gone:
+        event_bus.publish(f"post:{post_id}", "post.deleted", {"post_id": post_id})
+    # Full documents are only read back for posts someone is watching
+    watched = [post_id for post_id in changed if event_bus.has_subscribers(f"post:{post_id}")]
+    if watched:
+        async for post in db.posts.find({"post_id": {"$in": watched}}, {"_id": 0}):
+            event_bus.publish(f"post:{post['post_id']}", "post.updated", post, PostSummary)
+
+@api_router.post("/admin/posts/bulk")
+async def bulk_post_operation(data: BulkPostOperation, request: Request):
+    """Publish, unpublish, delete or retag many posts in one request with batched writes."""
+    await require_admin(request)
     
-    return {"message": "Post deleted"}
+    if data.operation not in BULK_OPERATIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown operation: {data.operation}")
+    if len(data.post_ids) > BULK_MAX_POSTS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_POSTS} posts per request")
+    
+    post_ids = list(dict.fromkeys(data.post_ids))
+    projection = {"_id": 0, "post_id": 1, "title": 1, "tags": 1, "published": 1, "created_at": 1}
+    posts = {p["post_id"]: p async for p in db.posts.find({"post_id": {"$in": post_ids}}, projection)}
+    results = {post_id: "not_found" for post_id in post_ids if post_id not in posts}
+    
+    added, removed = Counter(), Counter()
+    now = datetime.now(timezone.utc)
+    
+    async with write_session() as session:
+        if data.operation in ("publish", "unpublish"):
+            publish = data.operation == "publish"
+            targets = [p for p in posts.values() if p.get("published", True) != publish]
+            for post in posts.values():
+                results[post["post_id"]] = "unchanged"
+            for post in targets:
+                (added if publish else removed).update(list(dict.fromkeys(post.get("tags", []))))
+                results[post["post_id"]] = "updated"
+            if targets:
+                await db.posts.update_many(
+                    {"post_id": {"$in": [p["post_id"] for p in targets]}},
+                    {"$set": {"published": publish, "updated_at": now}},
+                    session=session
+                )
+        
+        elif data.operation == "delete":
+            for post in posts.values():
+                removed.update(visible_tags(post))
+                results[post["post_id"]] = "deleted"
+                _known_posts.pop(post["post_id"], None)
+            if posts:
+                await db.posts.delete_many({"post_id": {"$in": list(posts)}}, session=session)
+                await db.comments.delete_many({"post_id": {"$in": list(posts)}}, session=session)
+        
+        else:
+            operations = []
+            for post in posts.values():
+                old_tags = post.get("tags", [])
+                new_tags = [t for t in old_tags if t not in data.remove_tags]
+                new_tags += [t for t in dict.fromkeys(data.add_tags) if t not in new_tags]
+                if new_tags == old_tags:
+                    results[post["post_id"]] = "unchanged"
+                    continue
+                if post.get("published", True):
+                    added.update(t for t in new_tags if t not in old_tags)
+                    removed.update(t for t in old_tags if t not in new_tags)
+                operations.append(UpdateOne({"post_id": post["post_id"]}, {"$set": {
+                    "tags": new_tags, "search_terms": search_terms(post["title"], new_tags), "updated_at": now
+                }}))
+                results[post["post_id"]] = "updated"
+            if operations:
+                await db.posts.bulk_write(operations, ordered=False, session=session)
+        
+        if added or removed:
+            await apply_bulk_tag_delta(added, removed, session=session)
+    
+    if any(status in ("updated", "deleted") for status in results.values()):
+        _total_cache.clear()
+        await response_cache.invalidate("posts", "tags", *[f"post:{post_id}" for post_id in posts])
+    await publish_bulk_events(data.operation, posts, results)
+    
+    return {
+        "operation": data.operation,
+        "results": [{"post_id": post_id, "status": results[post_id]} for post_id in post_ids]
+    }
 
 # ============== COMMENT ROUTES ==============
 
-@api_router.get("/posts/{post_id}/comments", response_model=List[CommentResponse])
-async def get_comments(post_id: str):
-    comments = await db.comments.find({"post_id": post_id}, {"_id": 0}).sort("created_at", -1).to_list(100)
+COMMENTS_PAGE_SIZE = 50
+COMMENTS_MAX_PAGE_SIZE = 200
+COMMENT_FIELDS = {"_id": 0, "comment_id": 1, "post_id": 1, "content": 1, "author_name": 1, "created_at": 1}
+
+async def stream_comments(query: dict):
+    adapter = type_adapter(CommentResponse)
+    cursor = db.comments.find(query, COMMENT_FIELDS).sort([("created_at", DESCENDING), ("comment_id", DESCENDING)])
+    async for comment in cursor.batch_size(COMMENTS_MAX_PAGE_SIZE):
+        yield adapter.dump_json(adapter.validate_python(comment)) + b"\n"
+
+@api_router.get("/posts/{post_id}/comments", response_model=CommentPage)
+async def get_comments(
+    post_id: str,
+    request: Request,
+    response: Response,
+    limit: int = COMMENTS_PAGE_SIZE,
+    before: Optional[str] = None,
+    stream: bool = False
+):
+    """Newest-first comment pages; pass next_cursor back as before= for older ones."""
+    query = {"post_id": post_id}
+    if before:
+        query.update(keyset_filter(*decode_cursor(before), id_field="comment_id"))
     
-    for comment in comments:
-        if isinstance(comment.get("created_at"), str):
-            comment["created_at"] = datetime.fromisoformat(comment["created_at"])
+    if stream:
+        # Whole thread as NDJSON straight off the cursor, for very large threads
+        return StreamingResponse(stream_comments(query), media_type="application/x-ndjson")
+    
+    limit = min(max(limit, 1), COMMENTS_MAX_PAGE_SIZE)
+    post = await db.posts.find_one({"post_id": post_id}, {"_id": 0, "comment_count": 1})
+    comments = await db.comments.find(query, COMMENT_FIELDS).sort(
+        [("created_at", DESCENDING), ("comment_id", DESCENDING)]
+    ).limit(limit).to_list(limit)
+    
+    page = {
+        "items": comments,
+        "comment_count": post.get("comment_count", 0) if post else 0,
+        "next_cursor": encode_cursor(comments[-1]["created_at"], comments[-1]["comment_id"]) if len(comments) == limit else None
+    }
+    
+    not_modified = conditional_response(
+        request,
+        response,
+        make_etag([c["comment_id"] for c in comments], page["comment_count"], page["next_cursor"]),
+        CACHE_POLICIES["comments"]
+    )
+    if not_modified:
+        return not_modified
     
-    return comments
+    return model_response(CommentPage, page, response)
 
 @api_router.post("/posts/{post_id}/comments", response_model=CommentResponse)
-async def create_comment(post_id: str, data: CommentCreate):
-    post = await db.posts.find_one({"post_id": post_id}, {"_id": 0})
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
+async def create_comment(post_id: str, data: CommentCreate, request: Request):
+    # Per-IP first: a client that is already being throttled must not drain the post's shared bucket
+    for limiter, key in ((ip_comment_limiter, client_ip(request)), (post_comment_limiter, post_id)):
+        wait = limiter.acquire(key)
+        if wait:
+            raise HTTPException(status_code=429, detail="Too many comments, slow down",
+                                headers={"Retry-After": str(int(wait) + 1)})
     
-    comment_id = f"comment_{uuid.uuid4().hex[:12]}"
-    now = datetime.now(timezone.utc).isoformat()
+    if not await post_exists(post_id):
+        raise HTTPException(status_code=404, detail="Post not found")
     
     comment = {
-        "comment_id": comment_id,
+        "comment_id": f"comment_{uuid.uuid4().hex[:12]}",
         "post_id": post_id,
         "content": data.content,
         "author_name": data.author_name,
         "author_email": data.author_email,
-        "created_at": now
+        # Millisecond precision so the echoed and published created_at match reads and before= cursors
+        "created_at": to_millis(datetime.now(timezone.utc))
     }
     
-    await db.comments.insert_one(comment)
+    if COMMENT_WRITE_BEHIND:
+        comment_queue.put(dict(comment))
+    else:
+        await flush_comments([dict(comment)])
     
-    comment["created_at"] = datetime.fromisoformat(now)
     return comment
 
 @api_router.delete("/posts/{post_id}/comments/{comment_id}")
@@ -567,14 +2189,404 @@ async def delete_comment(post_id: str, comment_id: str, request: Request):
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Comment not found")
     
+    post = await db.posts.find_one_and_update(
+        {"post_id": post_id},
+        {"$inc": {"comment_count": -1}, "$set": {"comments_updated_at": datetime.now(timezone.utc)}},
+        projection={"_id": 0, "published": 1}
+    )
+    await response_cache.invalidate("posts", f"post:{post_id}")
+    if post and post.get("published", True):
+        event_bus.publish(f"post:{post_id}", "comment.deleted", {"comment_id": comment_id, "post_id": post_id})
+    
     return {"message": "Comment deleted"}
 
+# ============== EVENT ROUTES ==============
+
+@api_router.get("/posts/{post_id}/events")
+async def post_events(post_id: str, request: Request):
+    """Server-Sent Events for one post: comment.created/deleted, post.updated/deleted, resync.
+    
+    Events are only published while the post is published.
+    """
+    await find_readable_post(post_id, request, {"_id": 1, "published": 1})
+    
+    async def stream():
+        # Subscribed here, not in the handler: a client gone before the first chunk never starts the
+        # generator, so its finally would never run to unsubscribe
+        subscription = event_bus.subscribe(f"post:{post_id}")
+        try:
+            yield b"retry: 5000\n\n"
+            while True:
+                event = await subscription.next(EVENT_HEARTBEAT_SECONDS)
+                # Comment lines keep idle connections alive through proxies
+                yield event.sse() if event else b": ping\n\n"
+        finally:
+            event_bus.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@api_router.websocket("/posts/{post_id}/ws")
+async def post_events_ws(websocket: WebSocket, post_id: str):
+    """Same events as /events, as {"type", "data"} JSON messages."""
+    try:
+        await find_readable_post(post_id, websocket, {"_id": 1, "published": 1})
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    subscription = event_bus.subscribe(f"post:{post_id}")
+    
+    async def forward():
+        while True:
+            event = await subscription.queue.get()
+            await websocket.send_text(event.message())
+    
+    async def receive():
+        # Inbound messages are ignored; receiving is how we notice the client going away
+        while True:
+            await websocket.receive_text()
+    
+    sender = asyncio.create_task(forward())
+    receiver = asyncio.create_task(receive())
+    try:
+        # Either side ending (client gone, or a send failed) ends the connection
+        await asyncio.wait((sender, receiver), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        event_bus.unsubscribe(subscription)
+        sender.cancel()
+        receiver.cancel()
+        # Retrieve both outcomes so a failed send is logged here, not as "Task exception was never retrieved"
+        sent, received = await asyncio.gather(sender, receiver, return_exceptions=True)
+    if isinstance(sent, Exception) and not isinstance(received, WebSocketDisconnect):
+        logger.info(f"Event socket for {post_id} closed after a failed send: {sent!r}")
+
 # ============== TAG ROUTES ==============
 
 @api_router.get("/tags", response_model=List[TagResponse])
-async def get_tags():
+async def get_tags(request: Request, response: Response):
     tags = await db.tags.find({"count": {"$gt": 0}}, {"_id": 0}).sort("count", -1).to_list(50)
-    return tags
+    
+    not_modified = conditional_response(
+        request,
+        response,
+        make_etag(tags),
+        CACHE_POLICIES["tags"]
+    )
+    if not_modified:
+        return not_modified
+    
+    return model_response(List[TagResponse], tags, response)
+
+# ============== ADMIN MAINTENANCE ==============
+
+@api_router.post("/admin/reconcile/comment-counts")
+async def reconcile_comment_counts(request: Request):
+    """Recompute every post's denormalized comment_count from the comments collection."""
+    await require_admin(request)
+    return await recount_comments()
+
+async def recount_comments() -> dict:
+    pipeline = [{"$group": {"_id": "$post_id", "count": {"$sum": 1}}}]
+    counts = {}
+    async for row in db.comments.aggregate(pipeline):
+        counts[row["_id"]] = row["count"]
+    
+    operations = []
+    async for post in db.posts.find({}, {"_id": 0, "post_id": 1, "comment_count": 1}):
+        actual = counts.get(post["post_id"], 0)
+        if post.get("comment_count") != actual:
+            operations.append(UpdateOne({"post_id": post["post_id"]}, {"$set": {"comment_count": actual}}))
+    
+    if operations:
+        await db.posts.bulk_write(operations, ordered=False)
+    
+    logger.info(f"Reconciled comment counts: {len(operations)} posts corrected")
+    return {"corrected": len(operations)}
+
+# ============== EXPORT / IMPORT ==============
+
+EXPORT_COLLECTIONS = {"posts": "post", "comments": "comment"}
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', '500'))
+
+def ndjson_line(record_type: str, data: dict) -> bytes:
+    return (json.dumps({"type": record_type, "data": data}, default=lambda v: v.isoformat()) + "\n").encode()
+
+async def export_records(collections: List[str]):
+    # Streams straight from the cursor; memory stays at one batch regardless of collection size
+    for collection in collections:
+        record_type = EXPORT_COLLECTIONS[collection]
+        async for doc in db[collection].find({}, {"_id": 0}).batch_size(IMPORT_BATCH_SIZE):
+            yield ndjson_line(record_type, doc)
+
+@api_router.get("/admin/export")
+async def export_data(request: Request, collections: str = "posts,comments"):
+    """Stream posts and comments as NDJSON: one {"type", "data"} object per line."""
+    await require_admin(request)
+    
+    selected = [c.strip() for c in collections.split(",") if c.strip()]
+    unknown = set(selected) - set(EXPORT_COLLECTIONS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown collections: {', '.join(sorted(unknown))}")
+    
+    filename = f"blog-export-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}.ndjson"
+    return StreamingResponse(
+        export_records(selected),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+def parse_import_datetime(value) -> datetime:
+    if value is None:
+        return datetime.now(timezone.utc)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if not isinstance(value, datetime):
+        raise TypeError(f"invalid timestamp {value!r}")
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def require_string(data: dict, field: str, default: Optional[str] = None) -> str:
+    value = data.get(field, default) if default is not None else data[field]
+    if not isinstance(value, str):
+        raise TypeError(f"{field} must be a string")
+    return value
+
+def prepare_import_post(data: dict, author: dict) -> dict:
+    """Validate and build a post document; rendering is left to the batch flush."""
+    content = require_string(data, "content", "")
+    tags = data.get("tags", [])
+    if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        raise TypeError("tags must be a list of strings")
+    title = require_string(data, "title")
+    created_at = parse_import_datetime(data.get("created_at"))
+    return {
+        "post_id": data.get("post_id") or f"post_{uuid.uuid4().hex[:12]}",
+        "title": title,
+        "content": content,
+        "preview": data.get("preview") or (content[:200] + "..." if len(content) > 200 else content),
+        "tags": tags,
+        "search_terms": search_terms(title, tags),
+        "author_id": data.get("author_id") or author["user_id"],
+        "author_name": data.get("author_name") or author["name"],
+        "published": data.get("published", True),
+        "comment_count": 0,
+        "created_at": created_at,
+        "updated_at": parse_import_datetime(data.get("updated_at") or created_at)
+    }
+
+def prepare_import_comment(data: dict) -> dict:
+    return {
+        "comment_id": data.get("comment_id") or f"comment_{uuid.uuid4().hex[:12]}",
+        "post_id": require_string(data, "post_id"),
+        "content": require_string(data, "content"),
+        "author_name": require_string(data, "author_name"),
+        "author_email": data.get("author_email"),
+        "created_at": parse_import_datetime(data.get("created_at"))
+    }
+
+async def insert_import_batch(collection: str, docs: list, summary: dict):
+    if not docs:
+        return
+    try:
+        result = await db[collection].insert_many(docs, ordered=False)
+        summary[collection] += len(result.inserted_ids)
+    except BulkWriteError as e:
+        # Duplicates (already imported ids) are skipped; everything else in the batch still lands
+        summary[collection] += e.details.get("nInserted", 0)
+        summary["skipped"] += len(e.details.get("writeErrors", []))
+
+async def import_lines(lines, author: dict) -> dict:
+    summary = {"posts": 0, "comments": 0, "skipped": 0, "errors": []}
+    post_batch, comment_batch = [], []
+    
+    async def flush_posts():
+        # Render the whole (already validated) batch concurrently through the render pool
+        docs = list(post_batch)
+        post_batch.clear()
+        rendered = await asyncio.gather(*[rendered_fields(doc["content"]) for doc in docs])
+        for doc, fields in zip(docs, rendered):
+            doc.update(fields)
+        await insert_import_batch("posts", docs, summary)
+    
+    async def flush_comments():
+        docs = list(comment_batch)
+        comment_batch.clear()
+        await insert_import_batch("comments", docs, summary)
+    
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if record["type"] == "post":
+                post_batch.append(prepare_import_post(record["data"], author))
+            elif record["type"] == "comment":
+                comment_batch.append(prepare_import_comment(record["data"]))
+            else:
+                raise ValueError(f"unknown type {record['type']!r}")
+        except (ValueError, KeyError, TypeError) as e:
+            summary["skipped"] += 1
+            if len(summary["errors"]) < 20:
+                summary["errors"].append(f"line {line_number}: {e}")
+            continue
+        
+        if len(post_batch) >= IMPORT_BATCH_SIZE:
+            await flush_posts()
+        if len(comment_batch) >= IMPORT_BATCH_SIZE:
+            await flush_comments()
+    
+    await flush_posts()
+    await flush_comments()
+    return summary
+
+async def request_lines(request: Request):
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+@api_router.post("/admin/import")
+async def import_data(request: Request):
+    """Bulk-load an NDJSON export; counters and tag stats are rebuilt once at the end."""
+    user = await require_admin(request)
+    
+    try:
+        summary = await import_lines(request_lines(request), user)
+    finally:
+        # Batches written before a failure still need their counters and tag stats
+        await recount_comments()
+        await reconcile_tags()
+        _total_cache.clear()
+        await response_cache.invalidate("posts", "tags")
+    
+    logger.info(f"Import finished: {summary['posts']} posts, {summary['comments']} comments, {summary['skipped']} skipped")
+    return summary
+
+@api_router.post("/admin/reconcile/tags")
+async def reconcile_tag_counts(request: Request, dry_run: bool = False):
+    """Rebuild tags from posts; dry_run only reports the drift."""
+    await require_admin(request)
+    return await reconcile_tags(apply=not dry_run)
+
+@api_router.get("/admin/indexes/explain")
+async def explain_indexes(request: Request):
+    """Report the winning query plan for each route's query shape."""
+    await require_admin(request)
+    
+    report = []
+    for name, collection, query, sort in QUERY_SHAPES:
+        cursor = db[collection].find(query, {"_id": 0})
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = await cursor.limit(10).explain()
+        winning = plan.get("queryPlanner", {}).get("winningPlan", {})
+        report.append({
+            "route": name,
+            "collection": collection,
+            "winning_plan": winning,
+            "uses_index": "IXSCAN" in str(winning),
+        })
+    return report
+
+@api_router.post("/admin/rerender")
+async def rerender_posts(request: Request, batch_size: int = 200):
+    """Re-render only the posts whose stored HTML came from an older renderer configuration."""
+    await require_admin(request)
+    
+    stale = {"renderer_version": {"$ne": RENDERER_VERSION}}
+    rerendered = 0
+    operations = []
+    async for post in db.posts.find(stale, {"_id": 0, "post_id": 1, "content": 1}):
+        operations.append(UpdateOne({"post_id": post["post_id"]}, {"$set": await rendered_fields(post["content"])}))
+        if len(operations) >= batch_size:
+            await db.posts.bulk_write(operations, ordered=False)
+            rerendered += len(operations)
+            operations = []
+    if operations:
+        await db.posts.bulk_write(operations, ordered=False)
+        rerendered += len(operations)
+    
+    logger.info(f"Re-rendered {rerendered} posts to renderer version {RENDERER_VERSION}")
+    return {"rerendered": rerendered, "renderer_version": RENDERER_VERSION}
+
+@api_router.post("/admin/search-terms")
+async def backfill_search_terms(request: Request, batch_size: int = 200):
+    """Fill search_terms on posts written before prefix search read it."""
+    await require_admin(request)
+    
+    missing = {"search_terms": {"$exists": False}}
+    updated = 0
+    operations = []
+    async for post in db.posts.find(missing, {"_id": 0, "post_id": 1, "title": 1, "tags": 1}):
+        terms = search_terms(post["title"], post.get("tags", []))
+        operations.append(UpdateOne({"post_id": post["post_id"]}, {"$set": {"search_terms": terms}}))
+        if len(operations) >= batch_size:
+            await db.posts.bulk_write(operations, ordered=False)
+            updated += len(operations)
+            operations = []
+    if operations:
+        await db.posts.bulk_write(operations, ordered=False)
+        updated += len(operations)
+    
+    if updated:
+        # Cached searches and totals were computed without these posts
+        _total_cache.clear()
+        await response_cache.invalidate("posts")
+    logger.info(f"Backfilled search terms on {updated} posts")
+    return {"updated": updated}
+
+@api_router.get("/admin/render-cache/stats")
+async def get_render_cache_stats(request: Request):
+    await require_admin(request)
+    return render_cache.stats()
+
+@api_router.get("/admin/auth-cache/stats")
+async def get_auth_cache_stats(request: Request):
+    await require_admin(request)
+    return auth_cache.stats()
+
+@api_router.get("/admin/response-cache/stats")
+async def get_response_cache_stats(request: Request):
+    await require_admin(request)
+    return response_cache.stats()
+
+@api_router.get("/admin/events/stats")
+async def get_event_stats(request: Request):
+    await require_admin(request)
+    return event_bus.stats()
+
+@api_router.get("/admin/comment-queue/stats")
+async def get_comment_queue_stats(request: Request):
+    await require_admin(request)
+    return comment_queue.stats()
+
+@api_router.get("/admin/mongo/stats")
+async def get_mongo_stats(request: Request):
+    await require_admin(request)
+    options = mongo_client_options()
+    return {
+        **mongo_metrics.stats(),
+        "options": {
+            "max_pool_size": get_client().options.pool_options.max_pool_size,
+            "min_pool_size": get_client().options.pool_options.min_pool_size,
+            "compressors": options.get("compressors"),
+            "listing_read_preference": MONGO_LISTING_READ_PREFERENCE
+        }
+    }
+
+@api_router.get("/admin/pools/stats")
+async def get_pool_stats(request: Request):
+    await require_admin(request)
+    return {pool.name: pool.stats() for pool in WORKER_POOLS}
 
 # ============== ROOT ==============
 
@@ -582,8 +2594,67 @@ async def get_tags():
 async def root():
     return {"message": "Blog API", "version": "1.0"}
 
-# Include the router in the main app
-app.include_router(api_router)
+# Response models on the hot read paths; building their serializers is a first-request cost
+WARM_MODELS = [List[PostSummary], PostListResponse, PostResponse, CommentPage, List[TagResponse]]
+
+async def warm_up() -> dict:
+    """Pay first-request costs up front: Mongo connection, renderer imports, serializers."""
+    timings = {}
+    
+    start = time.perf_counter()
+    await db.command("ping")
+    timings["mongo_ms"] = (time.perf_counter() - start) * 1000
+    
+    start = time.perf_counter()
+    await render_pool.run(render_html, "warm *up*")
+    timings["renderer_ms"] = (time.perf_counter() - start) * 1000
+    
+    start = time.perf_counter()
+    for model_type in WARM_MODELS:
+        type_adapter(model_type)
+    timings["serializers_ms"] = (time.perf_counter() - start) * 1000
+    return timings
+
+@api_router.get("/warmup")
+async def warmup():
+    """Hit by the platform's warm-up/keep-alive ping so real traffic lands on a warm instance."""
+    return {"warm": True, **(await warm_up())}
+
+# ============== APP ==============
+
+CREATE_INDEXES_ON_STARTUP = os.environ.get('CREATE_INDEXES_ON_STARTUP', 'true').lower() == 'true'
+# Long-running servers warm up at startup; serverless instances can skip it and call /api/warmup
+WARMUP_ON_STARTUP = os.environ.get('WARMUP_ON_STARTUP', 'true').lower() == 'true'
+
+async def cache_anonymous_reads(request: Request, call_next):
+    route = match_cacheable_route(request) if request.method == "GET" else None
+    if route is None or not is_anonymous(request):
+        return await call_next(request)
+    key, tags = route
+    
+    # Cached and coalesced entries are shared by every caller, so the route always produces the full
+    # unconditional response; each caller's own validators are checked against it below
+    conditional = Request(dict(request.scope))
+    request.scope["headers"] = [
+        (name, value) for name, value in request.scope["headers"] if name not in CONDITIONAL_HEADERS
+    ]
+    
+    async def produce() -> dict:
+        response = await call_next(request)
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        return {"status": response.status_code, "headers": list(response.headers.items()), "body": body}
+    
+    entry = await response_cache.fetch(key, tags, produce)
+    headers = dict(entry["headers"])
+    
+    # Revalidate straight from the cached validators without reaching the route
+    etag = headers.get("etag")
+    last_modified = parsedate_to_datetime(headers["last-modified"]) if "last-modified" in headers else None
+    if etag and entry["status"] == 200 and is_not_modified(conditional, etag, last_modified):
+        passthrough = ("etag", "cache-control", "vary", "last-modified", "x-next-cursor")
+        return Response(status_code=304, headers={k: v for k, v in headers.items() if k in passthrough})
+    
+    return Response(content=entry["body"], status_code=entry["status"], headers=headers)
 
 # Get CORS origins - when credentials are used, we can't use wildcard
 cors_origins_str = os.environ.get('CORS_ORIGINS', '')
@@ -596,14 +2667,63 @@ if cors_origins_str == '*' or not cors_origins_str:
 else:
     cors_origins = cors_origins_str.split(',')
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=cors_origins,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+TAG_RECONCILE_INTERVAL_SECONDS = int(os.environ.get('TAG_RECONCILE_INTERVAL_SECONDS', '0'))
+
+async def reconcile_tags_periodically():
+    while True:
+        await asyncio.sleep(TAG_RECONCILE_INTERVAL_SECONDS)
+        try:
+            await reconcile_tags()
+        except Exception as e:
+            logger.warning(f"Periodic tag reconcile failed: {e}")
+
+_background_tasks = set()
+
+async def ensure_indexes():
+    if CREATE_INDEXES_ON_STARTUP:
+        await create_indexes()
+
+async def start_tag_reconciler():
+    if TAG_RECONCILE_INTERVAL_SECONDS > 0:
+        task = asyncio.create_task(reconcile_tags_periodically())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+async def warm_up_on_startup():
+    if WARMUP_ON_STARTUP:
+        try:
+            timings = await warm_up()
+            logger.info(f"Warm-up finished: {timings}")
+        except Exception as e:
+            logger.warning(f"Warm-up failed: {e}")
+
+async def drain_comment_queue():
+    await comment_queue.drain()
+    logger.info(f"Comment queue drained: {comment_queue.flushed} comments written")
 
-@app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
+    if _client is not None:
+        _client.close()
+    for pool in WORKER_POOLS:
+        pool.shutdown()
+
+def create_app() -> FastAPI:
+    """Build the ASGI app; `uvicorn --factory server:create_app` or the module-level `app`."""
+    app = FastAPI()
+    app.include_router(api_router)
+    app.middleware("http")(cache_anonymous_reads)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_credentials=True,
+        allow_origins=cors_origins,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag", "Last-Modified"],
+    )
+    for handler in (ensure_indexes, start_tag_reconciler, warm_up_on_startup):
+        app.add_event_handler("startup", handler)
+    for handler in (drain_comment_queue, shutdown_db_client):
+        app.add_event_handler("shutdown", handler)
+    return app
+
+app = create_app()
@@ -3,6 +3,8 @@ import sys
 import json
 from datetime import datetime
 import uuid
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 class BlogAPITester:
     def __init__(self, base_url="https://express-thoughts.preview.emergentagent.com"):
@@ -68,6 +70,18 @@ class BlogAPITester:
         )
         return success
 
+    def test_warmup_endpoint(self):
+        """Test the warm-up hook used by cold-start keep-alive pings"""
+        success, response = self.run_test(
+            "Warm-up Endpoint",
+            "GET",
+            "warmup",
+            200
+        )
+        if success:
+            print(f"   mongo {response.get('mongo_ms', 0):.1f} ms, renderer {response.get('renderer_ms', 0):.1f} ms")
+        return success and response.get('warm') is True
+
     def test_user_registration(self):
         """Test user registration - first user becomes admin"""
         test_email = f"admin_{uuid.uuid4().hex[:8]}@test.com"
@@ -138,6 +152,33 @@ class BlogAPITester:
             return True
         return False
 
+    def test_auth_path_benchmark(self):
+        """Microbenchmark /auth/me through the JWT path and the opaque session token path"""
+        if not self.admin_token:
+            print("❌ Cannot benchmark auth paths - no token available")
+            return False
+
+        self.tests_run += 1
+        print("\n🔍 Testing Auth Path Benchmark...")
+
+        paths = {
+            "jwt": (self.admin_token, 200),
+            "session": (f"session_{uuid.uuid4().hex}", 401),
+        }
+        for label, (token, expected_status) in paths.items():
+            headers = {'Authorization': f'Bearer {token}'}
+            start = time.perf_counter()
+            for _ in range(20):
+                response = requests.get(f"{self.api_url}/auth/me", headers=headers)
+                if response.status_code != expected_status:
+                    print(f"❌ Failed - {label} path returned {response.status_code}")
+                    return False
+            print(f"   {label}: {(time.perf_counter() - start) * 1000 / 20:.1f} ms/request")
+
+        self.tests_passed += 1
+        print("✅ Passed")
+        return True
+
     def test_create_post(self):
         """Test creating a blog post"""
         if not self.admin_token:
@@ -182,6 +223,106 @@ class BlogAPITester:
             return True
         return False
 
+    def test_posts_latency_by_limit(self):
+        """Benchmark posts list latency as the page size grows"""
+        timings = {}
+        for limit in (10, 50, 100):
+            start = time.perf_counter()
+            success, response = self.run_test(
+                f"Posts Latency (limit={limit})",
+                "GET",
+                f"posts?limit={limit}",
+                200
+            )
+            if not success:
+                return False
+            timings[limit] = (time.perf_counter() - start) * 1000
+            print(f"   {len(response)} posts in {timings[limit]:.1f} ms")
+
+        print(f"   limit=100 vs limit=10: {timings[100] / max(timings[10], 0.001):.2f}x")
+        return True
+
+    def test_cursor_pagination(self):
+        """Compare skip pagination and cursor pagination latency on a deep page"""
+        timings = {}
+        for label, endpoint in (("page 1", "posts?page=1&limit=10"), ("page 5000", "posts?page=5000&limit=10")):
+            start = time.perf_counter()
+            success, _ = self.run_test(f"Skip Pagination ({label})", "GET", endpoint, 200)
+            if not success:
+                return False
+            timings[label] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        response = self.session.get(f"{self.api_url}/posts?cursor=true&limit=10")
+        timings["cursor first page"] = (time.perf_counter() - start) * 1000
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if next_cursor:
+            start = time.perf_counter()
+            success, _ = self.run_test("Cursor Pagination (next page)", "GET", f"posts?limit=10&after={next_cursor}", 200)
+            if not success:
+                return False
+            timings["cursor next page"] = (time.perf_counter() - start) * 1000
+
+        for label, elapsed in timings.items():
+            print(f"   {label}: {elapsed:.1f} ms")
+        return True
+
+    def test_posts_latency_under_login_load(self):
+        """Load test: GET /posts p99 latency while logins are hammered"""
+        if not self.admin_user:
+            print("❌ Cannot run login load test - no admin user created")
+            return False
+
+        self.tests_run += 1
+        print("\n🔍 Testing Posts Latency Under Login Load...")
+
+        def timed_get():
+            start = time.perf_counter()
+            requests.get(f"{self.api_url}/posts?limit=10")
+            return (time.perf_counter() - start) * 1000
+
+        def login():
+            requests.post(f"{self.api_url}/auth/login", json={
+                "email": self.admin_user['email'],
+                "password": "TestPass123!"
+            })
+
+        def p99(samples):
+            samples = sorted(samples)
+            return samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            baseline = list(pool.map(lambda _: timed_get(), range(50)))
+
+        with ThreadPoolExecutor(max_workers=24) as pool:
+            logins = [pool.submit(login) for _ in range(50)]
+            loaded = list(pool.map(lambda _: timed_get(), range(50)))
+            for future in logins:
+                future.result()
+
+        print(f"   p99 idle: {p99(baseline):.1f} ms, p99 during logins: {p99(loaded):.1f} ms")
+        self.tests_passed += 1
+        print("✅ Passed")
+        return True
+
+    def test_list_payload_size(self):
+        """Measure payload bytes and latency of summary listings vs full listings"""
+        self.tests_run += 1
+        print("\n🔍 Testing List Payload Size...")
+
+        for label, endpoint in (("summary", "posts?limit=50"), ("full", "posts?limit=50&fields=content,content_html")):
+            start = time.perf_counter()
+            response = requests.get(f"{self.api_url}/{endpoint}")
+            elapsed = (time.perf_counter() - start) * 1000
+            if response.status_code != 200:
+                print(f"❌ Failed - {label} listing returned {response.status_code}")
+                return False
+            print(f"   {label}: {len(response.content)} bytes in {elapsed:.1f} ms")
+
+        self.tests_passed += 1
+        print("✅ Passed")
+        return True
+
     def test_get_single_post(self):
         """Test getting a single post"""
         if not self.test_post_id:
@@ -216,6 +357,25 @@ class BlogAPITester:
             return True
         return False
 
+    def test_prefix_search(self):
+        """Test that a partial, differently-cased word finds the test post through its tags"""
+        if not self.test_post_id:
+            print("❌ Cannot test prefix search - no test post")
+            return False
+
+        success, response = self.run_test(
+            "Prefix Search",
+            "GET",
+            "posts?search=AUTOMAT&limit=50",
+            200
+        )
+
+        if success and isinstance(response, list):
+            found = any(post['post_id'] == self.test_post_id for post in response)
+            print(f"   Search returned {len(response)} posts, test post found: {found}")
+            return found
+        return False
+
     def test_create_comment(self):
         """Test creating a comment"""
         if not self.test_post_id:
@@ -242,6 +402,103 @@ class BlogAPITester:
             return True
         return False
 
+    def test_comment_events(self):
+        """Test that a new comment is pushed to an open SSE subscription"""
+        if not self.test_post_id:
+            print("❌ Cannot test comment events - no test post")
+            return False
+
+        self.tests_run += 1
+        print("\n🔍 Testing Comment Events (SSE)...")
+        url = f"{self.api_url}/posts/{self.test_post_id}"
+
+        def first_event():
+            with requests.get(f"{url}/events", stream=True, timeout=10) as stream:
+                for line in stream.iter_lines(decode_unicode=True):
+                    if line.startswith("event: "):
+                        return line[len("event: "):]
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pending = pool.submit(first_event)
+            time.sleep(0.5)
+            start = time.perf_counter()
+            requests.post(f"{url}/comments", json={"content": "Pushed comment", "author_name": "Tester"})
+            event = pending.result()
+            print(f"   received {event} in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        if event != "comment.created":
+            print(f"❌ Failed - expected comment.created, got {event}")
+            return False
+        self.tests_passed += 1
+        print("✅ Passed")
+        return True
+
+    def test_comment_burst(self):
+        """Test that a comment burst from one client is rate limited and accepted comments land in order"""
+        if not self.test_post_id:
+            print("❌ Cannot test comment burst - no test post")
+            return False
+
+        self.tests_run += 1
+        print("\n🔍 Testing Comment Burst...")
+        url = f"{self.api_url}/posts/{self.test_post_id}/comments"
+
+        start = time.perf_counter()
+        accepted = []
+        statuses = []
+        for i in range(30):
+            response = requests.post(url, json={"content": f"Burst {i}", "author_name": "Burst"})
+            statuses.append(response.status_code)
+            if response.status_code == 200:
+                accepted.append(response.json()['comment_id'])
+        elapsed = time.perf_counter() - start
+        print(f"   {len(accepted)} accepted, {statuses.count(429)} rate limited, {30 / elapsed:.0f} req/s")
+
+        time.sleep(0.5)
+        stored = [c['comment_id'] for c in requests.get(f"{url}?limit=200").json()['items'] if c['comment_id'] in accepted]
+        stored.reverse()  # newest first on the wire
+
+        if not accepted or statuses.count(429) == 0:
+            print("❌ Failed - burst was not rate limited")
+            return False
+        if stored != accepted:
+            print(f"❌ Failed - {len(stored)}/{len(accepted)} accepted comments stored in order")
+            return False
+        self.tests_passed += 1
+        print("✅ Passed")
+        return True
+
+    def test_conditional_requests(self):
+        """Test ETag revalidation and invalidation after comment and post writes"""
+        if not self.test_post_id or not self.admin_token:
+            print("❌ Cannot test conditional requests - missing post ID or admin token")
+            return False
+
+        url = f"{self.api_url}/posts/{self.test_post_id}"
+        etag = self.session.get(url).headers.get("ETag")
+        if not etag:
+            print("❌ No ETag returned for post")
+            return False
+
+        success, _ = self.run_test("Post Revalidation (unchanged)", "GET", f"posts/{self.test_post_id}", 304,
+                                   headers={'If-None-Match': etag})
+        if not success:
+            return False
+
+        self.session.post(f"{url}/comments", json={"content": "Cache buster", "author_name": "Tester"})
+        time.sleep(0.5)  # comments are written behind; give the queue a flush
+        success, _ = self.run_test("Post Revalidation (after comment)", "GET", f"posts/{self.test_post_id}", 200,
+                                   headers={'If-None-Match': etag})
+        if not success:
+            return False
+
+        etag = self.session.get(url).headers.get("ETag")
+        self.session.put(url, json={"preview": "Updated for cache test"},
+                         headers={'Authorization': f'Bearer {self.admin_token}'})
+        success, _ = self.run_test("Post Revalidation (after update)", "GET", f"posts/{self.test_post_id}", 200,
+                                   headers={'If-None-Match': etag})
+        return success
+
     def test_get_comments(self):
         """Test getting comments for a post"""
         if not self.test_post_id:
@@ -255,8 +512,8 @@ class BlogAPITester:
             200
         )
 
-        if success and isinstance(response, list):
-            print(f"   Retrieved {len(response)} comments")
+        if success and isinstance(response.get('items'), list):
+            print(f"   Retrieved {len(response['items'])} of {response['comment_count']} comments")
             return True
         return False
 
@@ -276,6 +533,101 @@ class BlogAPITester:
             return True
         return False
 
+    def test_tag_counts_respect_publish_state(self):
+        """Test that tag counts only include published posts and follow publish toggles"""
+        if not self.admin_token:
+            print("❌ Cannot test tag counts - no admin token")
+            return False
+
+        headers = {'Authorization': f'Bearer {self.admin_token}'}
+        tag = f"draft-tag-{uuid.uuid4().hex[:8]}"
+
+        def tag_count():
+            tags = self.session.get(f"{self.api_url}/tags").json()
+            return next((t['count'] for t in tags if t['name'] == tag), 0)
+
+        success, post = self.run_test("Create Draft Post", "POST", "posts", 200, data={
+            "title": "Draft for tag counts", "content": "Draft", "tags": [tag], "published": False
+        }, headers=headers)
+        if not success:
+            return False
+
+        checks = [("draft", 0)]
+        counts = [tag_count()]
+        self.session.put(f"{self.api_url}/posts/{post['post_id']}", json={"published": True}, headers=headers)
+        checks.append(("published", 1))
+        counts.append(tag_count())
+        self.session.put(f"{self.api_url}/posts/{post['post_id']}", json={"published": False}, headers=headers)
+        checks.append(("unpublished", 0))
+        counts.append(tag_count())
+        self.session.delete(f"{self.api_url}/posts/{post['post_id']}", headers=headers)
+
+        self.tests_run += 1
+        for (state, expected), actual in zip(checks, counts):
+            print(f"   {state}: count {actual} (expected {expected})")
+        if [expected for _, expected in checks] == counts:
+            self.tests_passed += 1
+            print("✅ Passed")
+            return True
+        print("❌ Failed - tag counts do not follow publish state")
+        return False
+
+    def test_bulk_post_operation(self):
+        """Test bulk retag/unpublish/delete: per-item statuses and netted tag counts"""
+        if not self.admin_token:
+            print("❌ Cannot test bulk operations - no admin token")
+            return False
+
+        headers = {'Authorization': f'Bearer {self.admin_token}'}
+        suffix = uuid.uuid4().hex[:8]
+        old_tag, new_tag = f"bulk-old-{suffix}", f"bulk-new-{suffix}"
+
+        def tag_counts():
+            tags = self.session.get(f"{self.api_url}/tags").json()
+            counts = {t['name']: t['count'] for t in tags}
+            return counts.get(old_tag, 0), counts.get(new_tag, 0)
+
+        post_ids = []
+        for title, published in (("Bulk one", True), ("Bulk two", True), ("Bulk draft", False)):
+            success, post = self.run_test(f"Create Post ({title})", "POST", "posts", 200, data={
+                "title": title, "content": "Bulk", "tags": [old_tag], "published": published
+            }, headers=headers)
+            if not success:
+                return False
+            post_ids.append(post['post_id'])
+        missing_id = f"post_missing_{suffix}"
+
+        def bulk(operation, ids, **tags):
+            response = self.session.post(f"{self.api_url}/admin/posts/bulk", headers=headers,
+                                         json={"post_ids": ids, "operation": operation, **tags})
+            return [item['status'] for item in response.json()['results']]
+
+        # (label, statuses, expected statuses, (old_tag, new_tag) counts, expected counts)
+        checks = [("created", None, None, tag_counts(), (2, 0))]
+        statuses = bulk("retag", post_ids + [missing_id], add_tags=[new_tag], remove_tags=[old_tag])
+        checks.append(("retag", statuses, ["updated", "updated", "updated", "not_found"], tag_counts(), (0, 2)))
+        statuses = bulk("retag", post_ids[:1], add_tags=[new_tag])
+        checks.append(("retag again", statuses, ["unchanged"], tag_counts(), (0, 2)))
+        statuses = bulk("unpublish", post_ids)
+        checks.append(("unpublish", statuses, ["updated", "updated", "unchanged"], tag_counts(), (0, 0)))
+        statuses = bulk("publish", post_ids[:1])
+        checks.append(("publish one", statuses, ["updated"], tag_counts(), (0, 1)))
+        statuses = bulk("delete", post_ids)
+        checks.append(("delete", statuses, ["deleted", "deleted", "deleted"], tag_counts(), (0, 0)))
+
+        self.tests_run += 1
+        print("\n🔍 Testing Bulk Post Operations...")
+        ok = True
+        for label, actual_statuses, expected_statuses, counts, expected_counts in checks:
+            print(f"   {label}: statuses {actual_statuses}, tag counts {counts} (expected {expected_counts})")
+            ok = ok and actual_statuses == expected_statuses and counts == expected_counts
+        if ok:
+            self.tests_passed += 1
+            print("✅ Passed")
+            return True
+        print("❌ Failed - bulk statuses or tag counts are wrong")
+        return False
+
     def test_update_post(self):
         """Test updating a post"""
         if not self.test_post_id or not self.admin_token:
@@ -303,6 +655,44 @@ class BlogAPITester:
             return True
         return False
 
+    def test_concurrent_post_edits(self):
+        """Benchmark concurrent edits of one post and check tag counts stay consistent"""
+        if not self.test_post_id or not self.admin_token:
+            print("❌ Cannot test concurrent edits - missing post ID or admin token")
+            return False
+
+        self.tests_run += 1
+        print("\n🔍 Testing Concurrent Post Edits...")
+        headers = {'Authorization': f'Bearer {self.admin_token}'}
+        tag_sets = [["test", f"edit-{i % 3}"] for i in range(20)]
+
+        def edit(tags):
+            start = time.perf_counter()
+            response = requests.put(f"{self.api_url}/posts/{self.test_post_id}", json={"tags": tags}, headers=headers)
+            return response.status_code, (time.perf_counter() - start) * 1000
+
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            results = list(pool.map(edit, tag_sets))
+
+        latencies = sorted(elapsed for _, elapsed in results)
+        statuses = sorted({status for status, _ in results})
+        print(f"   statuses: {statuses}")
+        print(f"   p50: {latencies[len(latencies) // 2]:.1f} ms, p99: {latencies[-1]:.1f} ms")
+
+        tags = requests.get(f"{self.api_url}/tags").json()
+        for tag in [t for t in tags if t['name'].startswith("edit-")]:
+            expected = requests.get(f"{self.api_url}/posts/count?tag={tag['name']}").json()['count']
+            if tag['count'] != expected:
+                print(f"❌ Failed - tag {tag['name']} count {tag['count']}, expected {expected}")
+                return False
+
+        if not set(statuses) <= {200, 409}:
+            print("❌ Failed - unexpected status during concurrent edits")
+            return False
+        self.tests_passed += 1
+        print("✅ Passed")
+        return True
+
     def test_delete_comment(self):
         """Test deleting a comment (admin only)"""
         if not self.test_post_id or not self.test_comment_id or not self.admin_token:
@@ -370,17 +760,30 @@ def main():
     # Test sequence
     tests = [
         tester.test_root_endpoint,
+        tester.test_warmup_endpoint,
         tester.test_user_registration,
         tester.test_user_login,
         tester.test_get_current_user,
+        tester.test_auth_path_benchmark,
         tester.test_create_post,
         tester.test_get_posts,
+        tester.test_posts_latency_by_limit,
+        tester.test_cursor_pagination,
+        tester.test_posts_latency_under_login_load,
+        tester.test_list_payload_size,
         tester.test_get_single_post,
         tester.test_search_posts,
+        tester.test_prefix_search,
         tester.test_create_comment,
         tester.test_get_comments,
+        tester.test_comment_events,
+        tester.test_conditional_requests,
+        tester.test_comment_burst,
         tester.test_get_tags,
+        tester.test_tag_counts_respect_publish_state,
+        tester.test_bulk_post_operation,
         tester.test_update_post,
+        tester.test_concurrent_post_edits,
         tester.test_delete_comment,
         tester.test_delete_post,
         tester.test_logout
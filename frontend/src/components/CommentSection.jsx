@@ -6,7 +6,7 @@ import { Textarea } from "./ui/textarea";
 import { toast } from "sonner";
 import { MessageSquare, Trash2, Send, Heart } from "lucide-react";
 
-export default function CommentSection({ postId, comments, onCommentAdded, onCommentDeleted }) {
+export default function CommentSection({ postId, comments, totalCount, hasMore, onLoadMore, onCommentAdded, onCommentDeleted }) {
   const { user } = useContext(AuthContext);
   const [authorName, setAuthorName] = useState("");
   const [content, setContent] = useState("");
@@ -81,7 +81,7 @@ export default function CommentSection({ postId, comments, onCommentAdded, onCom
     <section className="mt-16 pt-12 border-t border-border/50" data-testid="comment-section">
       <h2 className="text-2xl md:text-3xl font-bold mb-8 flex items-center gap-3">
         <MessageSquare className="h-7 w-7 text-primary" />
-        Comments ({comments.length})
+        Comments ({totalCount ?? comments.length})
       </h2>
 
       {/* Comment Form */}
@@ -100,6 +100,7 @@ export default function CommentSection({ postId, comments, onCommentAdded, onCom
               value={authorName}
               onChange={(e) => setAuthorName(e.target.value)}
               placeholder="John Doe"
+              maxLength={100}
               className="cozy-input w-full"
               data-testid="comment-author-input"
             />
@@ -114,6 +115,7 @@ export default function CommentSection({ postId, comments, onCommentAdded, onCom
             value={content}
             onChange={(e) => setContent(e.target.value)}
             placeholder="Share your thoughts..."
+            maxLength={10000}
             className="cozy-input w-full min-h-[120px] resize-none"
             data-testid="comment-content-input"
           />
@@ -178,6 +180,19 @@ export default function CommentSection({ postId, comments, onCommentAdded, onCom
           ))
         )}
       </div>
+
+      {hasMore && (
+        <div className="flex justify-center mt-6">
+          <Button
+            variant="outline"
+            onClick={onLoadMore}
+            className="rounded-full"
+            data-testid="load-more-comments"
+          >
+            Load older comments
+          </Button>
+        </div>
+      )}
     </section>
   );
 }
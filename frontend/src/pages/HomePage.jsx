@@ -17,18 +17,12 @@ export default function HomePage() {
     const fetchPosts = async () => {
       setLoading(true);
       try {
-        const [postsRes, countRes] = await Promise.all([
-          fetch(`${API}/posts?page=${page}&limit=${limit}`),
-          fetch(`${API}/posts/count`),
-        ]);
+        const res = await fetch(`${API}/posts/listing?page=${page}&limit=${limit}`);
 
-        if (postsRes.ok) {
-          const postsData = await postsRes.json();
-          setPosts(postsData);
-        }
-        if (countRes.ok) {
-          const countData = await countRes.json();
-          setTotalCount(countData.count);
+        if (res.ok) {
+          const data = await res.json();
+          setPosts(data.items);
+          setTotalCount(data.total);
         }
       } catch (err) {
         console.error("Error fetching posts:", err);
@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { useParams, Link } from "react-router-dom";
 import { API } from "../App";
 import Layout from "../components/Layout";
@@ -9,8 +9,12 @@ export default function PostPage() {
   const { postId } = useParams();
   const [post, setPost] = useState(null);
   const [comments, setComments] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  // Our own writes come back over the event stream too; apply each comment change once
+  const addedIds = useRef(new Set());
+  const deletedIds = useRef(new Set());
 
   useEffect(() => {
     const fetchData = async () => {
@@ -30,7 +34,8 @@ export default function PostPage() {
 
         if (commentsRes.ok) {
           const commentsData = await commentsRes.json();
-          setComments(commentsData);
+          setComments(commentsData.items);
+          setNextCursor(commentsData.next_cursor);
         }
       } catch (err) {
         setError("Error loading post");
@@ -52,16 +57,60 @@ export default function PostPage() {
     });
   };
 
+  const loadMoreComments = async () => {
+    try {
+      const res = await fetch(`${API}/posts/${postId}/comments?before=${encodeURIComponent(nextCursor)}`);
+      if (res.ok) {
+        const data = await res.json();
+        setComments((prev) => [...prev, ...data.items]);
+        setNextCursor(data.next_cursor);
+      }
+    } catch (err) {
+      console.error("Error loading comments:", err);
+    }
+  };
+
   const handleCommentAdded = (newComment) => {
-    setComments([newComment, ...comments]);
-    setPost({ ...post, comment_count: (post.comment_count || 0) + 1 });
+    if (addedIds.current.has(newComment.comment_id)) return;
+    addedIds.current.add(newComment.comment_id);
+    setComments((prev) => [newComment, ...prev]);
+    setPost((prev) => prev && { ...prev, comment_count: (prev.comment_count || 0) + 1 });
   };
 
   const handleCommentDeleted = (commentId) => {
-    setComments(comments.filter((c) => c.comment_id !== commentId));
-    setPost({ ...post, comment_count: Math.max(0, (post.comment_count || 0) - 1) });
+    if (deletedIds.current.has(commentId)) return;
+    deletedIds.current.add(commentId);
+    setComments((prev) => prev.filter((c) => c.comment_id !== commentId));
+    setPost((prev) => prev && { ...prev, comment_count: Math.max(0, (prev.comment_count || 0) - 1) });
   };
 
+  useEffect(() => {
+    const source = new EventSource(`${API}/posts/${postId}/events`);
+
+    source.addEventListener("comment.created", (e) => handleCommentAdded(JSON.parse(e.data)));
+    source.addEventListener("comment.deleted", (e) => handleCommentDeleted(JSON.parse(e.data).comment_id));
+    source.addEventListener("post.updated", (e) => {
+      const updated = JSON.parse(e.data);
+      setPost((prev) => prev && { ...prev, ...updated });
+    });
+    source.addEventListener("post.deleted", () => {
+      source.close();
+      setError("Post not found");
+    });
+    // We fell too far behind and events were dropped: reload the newest comments
+    source.addEventListener("resync", async () => {
+      const res = await fetch(`${API}/posts/${postId}/comments`);
+      if (res.ok) {
+        const data = await res.json();
+        setComments(data.items);
+        setNextCursor(data.next_cursor);
+        setPost((prev) => prev && { ...prev, comment_count: data.comment_count });
+      }
+    });
+
+    return () => source.close();
+  }, [postId]);
+
   if (loading) {
     return (
       <Layout>
@@ -167,6 +216,9 @@ export default function PostPage() {
           <CommentSection
             postId={postId}
             comments={comments}
+            totalCount={post.comment_count}
+            hasMore={Boolean(nextCursor)}
+            onLoadMore={loadMoreComments}
             onCommentAdded={handleCommentAdded}
             onCommentDeleted={handleCommentDeleted}
           />
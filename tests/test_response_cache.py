@@ -0,0 +1,199 @@
+"""Unit tests for the anonymous response cache: backends, coalescing and the middleware.
+
+Run from the repo root with `python -m pytest tests`. Nothing here talks to MongoDB or Redis;
+FakeRedis below stands in for redis.asyncio.
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "blog_test")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from starlette.requests import Request  # noqa: E402
+from starlette.responses import StreamingResponse  # noqa: E402
+
+import server  # noqa: E402
+from server import MemoryResponseBackend, RedisResponseBackend, ResponseCache  # noqa: E402
+
+
+class FakeRedis:
+    """The slice of the redis.asyncio API RedisResponseBackend uses, kept in process memory."""
+
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value.encode() if isinstance(value, str) else value
+
+    async def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(member.encode() for member in members)
+
+    async def expire(self, key, seconds):
+        return True
+
+    async def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+            self.sets.pop(key, None)
+
+
+def entry(body: bytes = b"[]", status: int = 200) -> dict:
+    return {"status": status, "headers": [("content-type", "application/json"), ("etag", '"v1"')], "body": body}
+
+
+def test_memory_backend_hit_expiry_and_invalidation():
+    async def scenario():
+        backend = MemoryResponseBackend(max_size=10)
+        await backend.set("/api/tags?", entry(), ttl=60, tags=["tags"])
+        assert (await backend.get("/api/tags?"))["body"] == b"[]"
+
+        await backend.invalidate(["tags"])
+        assert await backend.get("/api/tags?") is None
+
+        await backend.set("/api/posts?", entry(), ttl=0, tags=["posts"])
+        assert await backend.get("/api/posts?") is None
+
+    asyncio.run(scenario())
+
+
+def test_memory_backend_prunes_tag_index_on_eviction_and_expiry():
+    async def scenario():
+        backend = MemoryResponseBackend(max_size=10)
+        for i in range(30):
+            await backend.set(f"/api/posts?page={i}", entry(), ttl=60, tags=["posts"])
+        assert len(backend.entries) == 10
+        assert len(backend.keys_by_tag["posts"]) == 10
+
+        await backend.set("/api/tags?", entry(), ttl=0, tags=["tags"])
+        assert await backend.get("/api/tags?") is None
+        assert "tags" not in backend.keys_by_tag
+
+    asyncio.run(scenario())
+
+
+def test_redis_backend_round_trip_and_invalidation():
+    async def scenario():
+        backend = RedisResponseBackend(FakeRedis())
+        await backend.set("/api/posts/p1?", entry(b'{"post_id":"p1"}'), ttl=30, tags=["post:p1"])
+        await backend.set("/api/tags?", entry(), ttl=30, tags=["tags"])
+
+        cached = await backend.get("/api/posts/p1?")
+        assert cached["body"] == b'{"post_id":"p1"}'
+        assert cached["status"] == 200
+
+        await backend.invalidate(["post:p1"])
+        assert await backend.get("/api/posts/p1?") is None
+        assert await backend.get("/api/tags?") is not None
+
+    asyncio.run(scenario())
+
+
+def test_fetch_counts_hits_and_misses():
+    async def scenario():
+        cache = ResponseCache(RedisResponseBackend(FakeRedis()), ttl_seconds=30)
+        calls = []
+
+        async def produce():
+            calls.append(1)
+            return entry()
+
+        await cache.fetch("k", ["posts"], produce)
+        await cache.fetch("k", ["posts"], produce)
+        assert len(calls) == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        await cache.invalidate("posts")
+        await cache.fetch("k", ["posts"], produce)
+        assert len(calls) == 2
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_misses_are_coalesced():
+    async def scenario():
+        cache = ResponseCache(MemoryResponseBackend(max_size=10), ttl_seconds=30)
+        calls = []
+
+        async def produce():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return entry()
+
+        results = await asyncio.gather(*(cache.fetch("k", ["posts"], produce) for _ in range(5)))
+        assert len(calls) == 1
+        assert cache.coalesced == 4
+        assert all(result["body"] == b"[]" for result in results)
+
+    asyncio.run(scenario())
+
+
+def test_invalidation_during_produce_skips_the_store():
+    async def scenario():
+        cache = ResponseCache(MemoryResponseBackend(max_size=10), ttl_seconds=30)
+
+        async def produce():
+            await cache.invalidate("posts")
+            return entry()
+
+        await cache.fetch("k", ["posts"], produce)
+        assert await cache.backend.get("k") is None
+
+    asyncio.run(scenario())
+
+
+def make_request(headers: dict) -> Request:
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/tags",
+        "raw_path": b"/api/tags",
+        "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+    }
+    return Request(scope)
+
+
+def test_cache_key_ignores_undeclared_query_params():
+    def key(path, query):
+        scope = {"type": "http", "method": "GET", "path": path, "query_string": query.encode(), "headers": []}
+        return server.match_cacheable_route(Request(scope))[0]
+
+    assert key("/api/posts", "limit=5&page=2") == key("/api/posts", "page=2&x=123&limit=5")
+    assert key("/api/posts", "limit=5") != key("/api/posts", "limit=6")
+    assert key("/api/posts/p1", "junk=1") == key("/api/posts/p1", "")
+
+
+def test_conditional_request_does_not_leak_304_to_coalesced_callers(monkeypatch):
+    monkeypatch.setattr(server, "response_cache", ResponseCache(MemoryResponseBackend(max_size=10), ttl_seconds=30))
+    routed = []
+
+    async def call_next(request):
+        # Stands in for the route, which (like BaseHTTPMiddleware's call_next) sees the scope as it is
+        # now; honours If-None-Match like conditional_response does
+        routed.append(request)
+        await asyncio.sleep(0.05)
+        if Request(request.scope).headers.get("if-none-match") == '"v1"':
+            return StreamingResponse(iter([b""]), status_code=304, headers={"etag": '"v1"'})
+        return StreamingResponse(iter([b'[{"name":"python"}]']), headers={"etag": '"v1"'})
+
+    async def scenario():
+        return await asyncio.gather(
+            server.cache_anonymous_reads(make_request({"If-None-Match": '"v1"'}), call_next),
+            server.cache_anonymous_reads(make_request({}), call_next),
+        )
+
+    revalidated, plain = asyncio.run(scenario())
+    assert len(routed) == 1
+    assert revalidated.status_code == 304
+    assert plain.status_code == 200
+    assert plain.body == b'[{"name":"python"}]'